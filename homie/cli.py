@@ -7,8 +7,9 @@ from pathlib import Path
 
 import click
 from rich.console import Console
+from rich.markup import escape
 
-from . import __version__
+from . import __version__, fastjson
 from .client import Client
 from .config import get_or_create_config, save_config, HomieConfig
 from .discovery import Discovery, Peer
@@ -17,6 +18,7 @@ from .ui import (
     LiveDashboard,
     console,
     create_history_table,
+    flush_job_output,
     print_history_summary,
     print_job_complete,
     print_job_error,
@@ -126,30 +128,38 @@ def up(name: str):
     docker_ok = worker.is_docker_available()
     gpu_ok = worker.has_gpu_support() if docker_ok else False
 
+    # Pull the configured environment images while we wait for jobs
+    if docker_ok:
+        worker.warmup(config.envs.values())
+
     # Create discovery with callbacks
     def on_peer_joined(peer: Peer):
-        dashboard.add_event(f"[green]{peer.name}[/] joined ({peer.ip})")
+        dashboard.add_event(f"[green]{escape(peer.name)}[/] joined ({escape(peer.ip)})")
 
     def on_peer_left(peer: Peer):
-        dashboard.add_event(f"[red]{peer.name}[/] left")
+        dashboard.add_event(f"[red]{escape(peer.name)}[/] left")
 
     def on_status_changed(status: str):
         discovery.set_status(status)
+        dashboard.wake()
 
     discovery = Discovery(
         config,
         on_peer_joined=on_peer_joined,
         on_peer_left=on_peer_left,
+        on_peers_changed=lambda: dashboard.wake(),
     )
 
     worker.on_status_changed = on_status_changed
 
+    # Create the dashboard before starting services so callbacks can reach it
+    dashboard = LiveDashboard(config.name, discovery, worker, docker_ok, gpu_ok)
+
     # Start services
     discovery.start()
     worker.start()
 
     # Run live dashboard
-    dashboard = LiveDashboard(config.name, discovery, worker, docker_ok, gpu_ok)
     dashboard.run()
 
     # Cleanup
@@ -172,33 +182,11 @@ def peers(wait: int):
     config = get_or_create_config()
 
     # First, try to read from the peer cache file (written by homie up)
-    peer_cache = Path.home() / ".homie" / "peer_cache.json"
-    if peer_cache.exists():
-        import json
-        try:
-            cache_data = json.loads(peer_cache.read_text())
-            cache_age = time.time() - cache_data.get("timestamp", 0)
-            if cache_age < 10:  # Cache is fresh (less than 10 seconds old)
-                peer_list = [
-                    Peer(
-                        name=p["name"],
-                        ip=p["ip"],
-                        port=p["port"],
-                        cpu_percent_used=p["cpu_percent_used"],
-                        ram_free_gb=p["ram_free_gb"],
-                        ram_total_gb=p["ram_total_gb"],
-                        gpu_name=p.get("gpu_name"),
-                        gpu_memory_free_gb=p.get("gpu_memory_free_gb"),
-                        status=p["status"],
-                        last_seen=p.get("last_seen", time.time()),
-                    )
-                    for p in cache_data.get("peers", [])
-                ]
-                console.print()
-                print_peers_table(peer_list)
-                return
-        except Exception:
-            pass
+    peer_list = _get_peers_from_cache(config)
+    if peer_list is not None:
+        console.print()
+        print_peers_table(peer_list)
+        return
 
     # Fallback: do our own discovery (works if homie up isn't running)
     console.print(f"[dim]Discovering peers for {wait} seconds...[/]")
@@ -218,30 +206,30 @@ def peers(wait: int):
 
 def _get_peers_from_cache(config) -> list:
     """Try to get peers from cache file."""
-    import json
     peer_cache = Path.home() / ".homie" / "peer_cache.json"
-    if peer_cache.exists():
-        try:
-            cache_data = json.loads(peer_cache.read_text())
-            cache_age = time.time() - cache_data.get("timestamp", 0)
-            if cache_age < 10:  # Cache is fresh
-                return [
-                    Peer(
-                        name=p["name"],
-                        ip=p["ip"],
-                        port=p["port"],
-                        cpu_percent_used=p["cpu_percent_used"],
-                        ram_free_gb=p["ram_free_gb"],
-                        ram_total_gb=p["ram_total_gb"],
-                        gpu_name=p.get("gpu_name"),
-                        gpu_memory_free_gb=p.get("gpu_memory_free_gb"),
-                        status=p["status"],
-                        last_seen=p.get("last_seen", time.time()),
-                    )
-                    for p in cache_data.get("peers", [])
-                ]
-        except Exception:
-            pass
+    try:
+        # One read + parse; a missing file just raises
+        cache_data = fastjson.loads(peer_cache.read_bytes())
+        cache_age = time.time() - cache_data.get("timestamp", 0)
+        if cache_age < 10:  # Cache is fresh
+            now = time.time()
+            return [
+                Peer(
+                    name=p["name"],
+                    ip=p["ip"],
+                    port=p["port"],
+                    cpu_percent_used=p["cpu_percent_used"],
+                    ram_free_gb=p["ram_free_gb"],
+                    ram_total_gb=p["ram_total_gb"],
+                    gpu_name=p.get("gpu_name"),
+                    gpu_memory_free_gb=p.get("gpu_memory_free_gb"),
+                    status=p["status"],
+                    last_seen=p.get("last_seen", now),
+                )
+                for p in cache_data.get("peers", [])
+            ]
+    except Exception:
+        pass
     return None
 
 
@@ -347,9 +335,11 @@ def run(script: str, peer: str, env_name: str, image: str, files: tuple, gpu: bo
                 print_job_output(target_peer.name, line.rstrip('\n'))
             else:
                 # Partial line - print without newline prefix
+                flush_job_output()
                 console.print(f"[dim][{target_peer.name}][/] {line}", end="")
 
     def on_stderr(data: str):
+        flush_job_output()
         for line in data.splitlines(keepends=True):
             console.print(f"[red]{line.rstrip()}")
 
@@ -624,15 +614,15 @@ def add(ip: str):
     peers_file.parent.mkdir(parents=True, exist_ok=True)
 
     # Load existing peers
-    existing = []
-    if peers_file.exists():
-        existing = [p.strip() for p in peers_file.read_text().split("\n") if p.strip()]
+    content = peers_file.read_text() if peers_file.exists() else ""
+    existing = [p.strip() for p in content.split("\n") if p.strip()]
 
     if ip in existing:
         console.print(f"[yellow]Peer {ip} already added[/]")
     else:
-        existing.append(ip)
-        peers_file.write_text("\n".join(existing) + "\n")
+        # Append one line rather than rewriting the whole list
+        with open(peers_file, "a") as f:
+            f.write(("\n" if content and not content.endswith("\n") else "") + ip + "\n")
         console.print(f"[green]✓[/] Added peer: {ip}")
         console.print()
         console.print("[dim]This peer will now receive direct heartbeats.[/]")
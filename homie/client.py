@@ -1,14 +1,29 @@
 """TCP client for submitting jobs to peers."""
 
-import json
+import selectors
 import socket
 import time
 from typing import Callable, Optional
 
+from . import fastjson
 from .config import HomieConfig
 from .discovery import Peer
 from .history import append_job_start, update_job_completion
-from .jobs import Job, JobResult, compute_auth_hmac, deserialize_result, serialize_job
+from .jobs import (
+    _SOCKET_BUFFER_SIZE,
+    _U32,
+    Job,
+    JobResult,
+    compute_auth_hmac,
+    deserialize_result,
+    serialize_job_parts,
+)
+
+# Don't raise SIGPIPE if the peer hangs up mid-send (Linux)
+_SEND_FLAGS = getattr(socket, "MSG_NOSIGNAL", 0)
+
+# Stay well under IOV_MAX (1024 on Linux and macOS) per sendmsg call
+_SENDMSG_MAX_BUFFERS = 512
 
 
 class Client:
@@ -31,7 +46,9 @@ class Client:
         Args:
             peer: The peer to run the job on
             job: The job to execute
-            timeout: Maximum time to wait for result (seconds)
+            timeout: Time allowed to connect and send the job, and then the
+                longest the worker may go quiet between messages (seconds).
+                The job itself can run for as long as the worker allows.
             on_stdout: Callback for stdout chunks (real-time streaming)
             on_stderr: Callback for stderr chunks (real-time streaming)
 
@@ -50,67 +67,33 @@ class Client:
             role="mooch",
         )
 
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+        # Covers connecting and sending the job
+        deadline = time.monotonic() + timeout
 
         try:
-            # Connect to peer
-            sock.connect((peer.ip, peer.port))
-
-            # Send message type prefix
-            sock.sendall(b'J')
-
-            # Serialize and send job
-            job_data = serialize_job(job, self.config.group_secret).encode()
-            sock.sendall(len(job_data).to_bytes(4, "big"))
-            sock.sendall(job_data)
-
-            # Read streaming messages until we get the final result
-            while True:
-                # Read message type (1 byte)
-                msg_type = self._recv_exactly(sock, 1)
-                if not msg_type:
-                    result = JobResult(
-                        job_id=job.job_id,
-                        exit_code=-1,
-                        stdout="",
-                        stderr="",
-                        error="Connection closed by peer",
-                    )
-                    # Log completion
-                    update_job_completion(
-                        job_id=job.job_id,
-                        exit_code=-1,
-                        runtime_seconds=0,
-                        error=result.error,
-                    )
-                    return result
-
-                if msg_type == b'O':
-                    # stdout chunk
-                    length = int.from_bytes(self._recv_exactly(sock, 4), "big")
-                    data = self._recv_exactly(sock, length)
-                    if data and on_stdout:
-                        on_stdout(data.decode("utf-8", errors="replace"))
-
-                elif msg_type == b'E':
-                    # stderr chunk
-                    length = int.from_bytes(self._recv_exactly(sock, 4), "big")
-                    data = self._recv_exactly(sock, length)
-                    if data and on_stderr:
-                        on_stderr(data.decode("utf-8", errors="replace"))
-
-                elif msg_type == b'R':
-                    # Final result
-                    length = int.from_bytes(self._recv_exactly(sock, 4), "big")
-                    result_data = self._recv_exactly(sock, length)
-                    if not result_data:
+            with self._connect(peer, timeout) as sock:
+                # Send the frame parts as they are, behind the message type
+                # and length prefix, without joining them into one buffer
+                parts = serialize_job_parts(job, self.config.hmac_template)
+                size = sum(map(len, parts))
+                self._send_parts(sock, [b'B' + _U32.pack(size), *parts], deadline)
+
+                # Read streaming messages until we get the final result
+                while True:
+                    # The job may run (quietly) for up to the worker's own
+                    # container timeout, so bound the wait for each message
+                    # rather than the whole exchange
+                    deadline = time.monotonic() + timeout
+
+                    # Read message type (1 byte)
+                    msg_type = self._recv_exactly(sock, 1, deadline)
+                    if not msg_type:
                         result = JobResult(
                             job_id=job.job_id,
                             exit_code=-1,
                             stdout="",
                             stderr="",
-                            error="Failed to receive result from peer",
+                            error="Connection closed by peer",
                         )
                         # Log completion
                         update_job_completion(
@@ -121,28 +104,44 @@ class Client:
                         )
                         return result
 
-                    result = deserialize_result(result_data.decode())
-
-                    # Log completion to history
-                    update_job_completion(
-                        job_id=job.job_id,
-                        exit_code=result.exit_code,
-                        runtime_seconds=result.runtime_seconds,
-                        error=result.error,
-                        output_file_count=len(result.output_files),
-                    )
-
-                    return result
-
-                else:
-                    # Unknown message type - might be old protocol (no streaming)
-                    # Try to read as length-prefixed result
-                    length_bytes = msg_type + self._recv_exactly(sock, 3)
-                    length = int.from_bytes(length_bytes, "big")
-                    result_data = self._recv_exactly(sock, length)
-                    if result_data:
-                        result = deserialize_result(result_data.decode())
-                        # Log completion
+                    if msg_type == b'O':
+                        # stdout chunk
+                        length = _U32.unpack(self._recv_exactly(sock, 4, deadline))[0]
+                        data = self._recv_exactly(sock, length, deadline)
+                        if data is not None and on_stdout:
+                            on_stdout(data.decode("utf-8", "replace"))
+
+                    elif msg_type == b'E':
+                        # stderr chunk
+                        length = _U32.unpack(self._recv_exactly(sock, 4, deadline))[0]
+                        data = self._recv_exactly(sock, length, deadline)
+                        if data is not None and on_stderr:
+                            on_stderr(data.decode("utf-8", "replace"))
+
+                    elif msg_type == b'R':
+                        # Final result
+                        length = _U32.unpack(self._recv_exactly(sock, 4, deadline))[0]
+                        result_data = self._recv_exactly(sock, length, deadline)
+                        if not result_data:
+                            result = JobResult(
+                                job_id=job.job_id,
+                                exit_code=-1,
+                                stdout="",
+                                stderr="",
+                                error="Failed to receive result from peer",
+                            )
+                            # Log completion
+                            update_job_completion(
+                                job_id=job.job_id,
+                                exit_code=-1,
+                                runtime_seconds=0,
+                                error=result.error,
+                            )
+                            return result
+
+                        result = deserialize_result(result_data)
+
+                        # Log completion to history
                         update_job_completion(
                             job_id=job.job_id,
                             exit_code=result.exit_code,
@@ -150,21 +149,45 @@ class Client:
                             error=result.error,
                             output_file_count=len(result.output_files),
                         )
+
+                        return result
+
+                    else:
+                        # Unknown message type - might be old protocol (no streaming)
+                        # Try to read as length-prefixed result
+                        length_bytes = msg_type + self._recv_exactly(sock, 3, deadline)
+                        length = _U32.unpack(length_bytes)[0]
+                        result_data = self._recv_exactly(sock, length, deadline)
+                        if result_data:
+                            result = deserialize_result(result_data)
+                            if result.error and result.error.startswith("Unknown message type"):
+                                result.error = (
+                                    "Peer is running an older homie that can't "
+                                    "accept this job format - it needs to upgrade"
+                                )
+                            # Log completion
+                            update_job_completion(
+                                job_id=job.job_id,
+                                exit_code=result.exit_code,
+                                runtime_seconds=result.runtime_seconds,
+                                error=result.error,
+                                output_file_count=len(result.output_files),
+                            )
+                            return result
+                        result = JobResult(
+                            job_id=job.job_id,
+                            exit_code=-1,
+                            stdout="",
+                            stderr="",
+                            error="Unknown response from peer",
+                        )
+                        update_job_completion(
+                            job_id=job.job_id,
+                            exit_code=-1,
+                            runtime_seconds=0,
+                            error=result.error,
+                        )
                         return result
-                    result = JobResult(
-                        job_id=job.job_id,
-                        exit_code=-1,
-                        stdout="",
-                        stderr="",
-                        error="Unknown response from peer",
-                    )
-                    update_job_completion(
-                        job_id=job.job_id,
-                        exit_code=-1,
-                        runtime_seconds=0,
-                        error=result.error,
-                    )
-                    return result
 
         except socket.timeout:
             result = JobResult(
@@ -214,18 +237,79 @@ class Client:
                 error=result.error,
             )
             return result
-        finally:
-            sock.close()
 
-    def _recv_exactly(self, sock: socket.socket, n: int) -> Optional[bytes]:
+    def _connect(self, peer: Peer, timeout: float) -> socket.socket:
+        """Open a non-blocking connection to a peer's worker."""
+        sock = socket.create_connection((peer.ip, peer.port), timeout=timeout)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+        return sock
+
+    def _recv_exactly(self, sock: socket.socket, n: int, deadline: float) -> Optional[bytearray]:
         """Receive exactly n bytes from socket."""
-        data = b""
-        while len(data) < n:
-            chunk = sock.recv(n - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+        buf = bytearray(n)
+        if not self._recv_into(sock, buf, n, deadline):
+            return None
+        return buf
+
+    def _recv_into(self, sock: socket.socket, buf: bytearray, n: int, deadline: float) -> bool:
+        """Receive exactly n bytes into the start of buf. Returns False on EOF."""
+        view = memoryview(buf)
+        received = 0
+        while received < n:
+            try:
+                count = sock.recv_into(view[received:n])
+            except BlockingIOError:
+                self._wait_ready(sock, selectors.EVENT_READ, deadline)
+                continue
+            if not count:
+                return False
+            received += count
+        return True
+
+    def _send_all(self, sock: socket.socket, data: bytes, deadline: float) -> None:
+        """Send all of data on a non-blocking socket before the deadline."""
+        view = memoryview(data)
+        while view:
+            try:
+                sent = sock.send(view, _SEND_FLAGS)
+            except BlockingIOError:
+                self._wait_ready(sock, selectors.EVENT_WRITE, deadline)
+                continue
+            view = view[sent:]
+
+    def _send_parts(self, sock: socket.socket, parts: list, deadline: float) -> None:
+        """Send parts back to back, with scatter-gather I/O where available."""
+        if not hasattr(sock, "sendmsg"):
+            # Windows has no sendmsg
+            self._send_all(sock, b"".join(parts), deadline)
+            return
+        views = [memoryview(part) for part in parts if len(part)]
+        first = 0
+        while first < len(views):
+            try:
+                sent = sock.sendmsg(views[first:first + _SENDMSG_MAX_BUFFERS], (), _SEND_FLAGS)
+            except BlockingIOError:
+                self._wait_ready(sock, selectors.EVENT_WRITE, deadline)
+                continue
+            # Skip whatever was fully sent and trim a partially sent part
+            while first < len(views) and sent >= len(views[first]):
+                sent -= len(views[first])
+                first += 1
+            if sent:
+                views[first] = views[first][sent:]
+
+    def _wait_ready(self, sock: socket.socket, event: int, deadline: float) -> None:
+        """Wait until sock is readable/writable, raising socket.timeout at the deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            with selectors.DefaultSelector() as sel:
+                sel.register(sock, event)
+                if sel.select(remaining):
+                    return
+        raise socket.timeout("timed out")
 
     def kill_job(self, peer: Peer, job_id: str, timeout: int = 10) -> bool:
         """
@@ -239,39 +323,36 @@ class Client:
         Returns:
             True if job was killed, False otherwise
         """
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+        # Bounds the whole request, reply included
+        deadline = time.monotonic() + timeout
 
         try:
-            sock.connect((peer.ip, peer.port))
-
-            # Send message type prefix
-            sock.sendall(b'K')
-
-            # Build kill payload with auth
-            timestamp = time.time()
-            auth_hmac = compute_auth_hmac(job_id, timestamp, self.config.group_secret)
-            payload = json.dumps({
-                "job_id": job_id,
-                "requester": self.config.name,  # Only sender can kill their own jobs
-                "auth": {
-                    "hmac": auth_hmac,
-                    "timestamp": timestamp,
-                }
-            }).encode()
-
-            # Send length-prefixed payload
-            sock.sendall(len(payload).to_bytes(4, "big"))
-            sock.sendall(payload)
-
-            # Receive result (1 byte: '1' = success, '0' = failure)
-            result = sock.recv(1)
-            return result == b'1'
+            with self._connect(peer, timeout) as sock:
+                # Send message type prefix
+                self._send_all(sock, b'K', deadline)
+
+                # Build kill payload with auth
+                timestamp = time.time()
+                auth_hmac = compute_auth_hmac(job_id, timestamp, self.config.hmac_template)
+                payload = fastjson.dumps({
+                    "job_id": job_id,
+                    "requester": self.config.name,  # Only sender can kill their own jobs
+                    "auth": {
+                        "hmac": auth_hmac,
+                        "timestamp": timestamp,
+                    }
+                })
+
+                # Send length-prefixed payload
+                self._send_all(sock, _U32.pack(len(payload)), deadline)
+                self._send_all(sock, payload, deadline)
+
+                # Receive result (1 byte: '1' = success, '0' = failure)
+                result = self._recv_exactly(sock, 1, deadline)
+                return result == b'1'
 
         except Exception:
             return False
-        finally:
-            sock.close()
 
     def list_jobs(self, peer: Peer, timeout: int = 10) -> Optional[list[dict]]:
         """
@@ -284,47 +365,44 @@ class Client:
         Returns:
             List of job info dicts, or None on error
         """
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+        # Bounds the whole request, reply included
+        deadline = time.monotonic() + timeout
 
         try:
-            sock.connect((peer.ip, peer.port))
-
-            # Send message type prefix
-            sock.sendall(b'L')
-
-            # Build auth payload
-            timestamp = time.time()
-            auth_hmac = compute_auth_hmac("list", timestamp, self.config.group_secret)
-            payload = json.dumps({
-                "auth": {
-                    "hmac": auth_hmac,
-                    "timestamp": timestamp,
-                }
-            }).encode()
-
-            # Send length-prefixed payload
-            sock.sendall(len(payload).to_bytes(4, "big"))
-            sock.sendall(payload)
-
-            # Receive result (1 byte status, then length-prefixed JSON if success)
-            status = sock.recv(1)
-            if status != b'1':
-                return None
-
-            length_bytes = self._recv_exactly(sock, 4)
-            if not length_bytes:
-                return None
-
-            length = int.from_bytes(length_bytes, "big")
-            response_data = self._recv_exactly(sock, length)
-            if not response_data:
-                return None
-
-            response = json.loads(response_data.decode())
-            return response.get("jobs", [])
+            with self._connect(peer, timeout) as sock:
+                # Send message type prefix
+                self._send_all(sock, b'L', deadline)
+
+                # Build auth payload
+                timestamp = time.time()
+                auth_hmac = compute_auth_hmac("list", timestamp, self.config.hmac_template)
+                payload = fastjson.dumps({
+                    "auth": {
+                        "hmac": auth_hmac,
+                        "timestamp": timestamp,
+                    }
+                })
+
+                # Send length-prefixed payload
+                self._send_all(sock, _U32.pack(len(payload)), deadline)
+                self._send_all(sock, payload, deadline)
+
+                # Receive result (1 byte status, then length-prefixed JSON if success)
+                status = self._recv_exactly(sock, 1, deadline)
+                if status != b'1':
+                    return None
+
+                length_bytes = self._recv_exactly(sock, 4, deadline)
+                if not length_bytes:
+                    return None
+
+                length = _U32.unpack(length_bytes)[0]
+                response_data = self._recv_exactly(sock, length, deadline)
+                if not response_data:
+                    return None
+
+                response = fastjson.loads(response_data)
+                return response.get("jobs", [])
 
         except Exception:
             return None
-        finally:
-            sock.close()
@@ -1,5 +1,7 @@
 """Configuration handling for Homie Compute."""
 
+import functools
+import hmac
 import os
 import secrets
 from dataclasses import dataclass, field
@@ -8,6 +10,12 @@ from typing import Optional
 
 import yaml
 
+# Prefer the libyaml-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
 
 HOMIE_DIR = Path.home() / ".homie"
 CONFIG_FILE = HOMIE_DIR / "config.yaml"
@@ -20,6 +28,7 @@ class HomieConfig:
     name: str = field(default_factory=lambda: os.environ.get("USER", "homie"))
     discovery_port: int = 5555
     worker_port: int = 5556
+    worker_max_connections: int = 32
     group_secret: str = field(default_factory=lambda: secrets.token_urlsafe(16))
 
     # Container settings (for plug)
@@ -27,6 +36,8 @@ class HomieConfig:
     container_memory_limit: str = "4g"
     container_timeout: int = 600
     container_network: str = "none"
+    container_workspace_root: str = "/dev/shm"  # tmpfs; falls back to the system temp dir
+    container_tmp_size: str = "100M"
 
     # Environment settings (for mooch)
     envs: dict = field(default_factory=lambda: {"py": "python:3.11-slim"})
@@ -36,6 +47,18 @@ class HomieConfig:
     heartbeat_interval: float = 2.0
     peer_timeout: float = 10.0
 
+    # Cached HMAC key state derived from group_secret (see hmac_template)
+    _hmac_secret: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _hmac_key: Optional[hmac.HMAC] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def hmac_template(self) -> hmac.HMAC:
+        """HMAC-SHA256 pre-keyed with the group secret. Call .copy() before use."""
+        if self._hmac_key is None or self._hmac_secret != self.group_secret:
+            self._hmac_key = hmac.new(self.group_secret.encode(), digestmod="sha256")
+            self._hmac_secret = self.group_secret
+        return self._hmac_key
+
 
 def ensure_homie_dir() -> Path:
     """Ensure the .homie directory exists."""
@@ -43,16 +66,33 @@ def ensure_homie_dir() -> Path:
     return HOMIE_DIR
 
 
+@functools.lru_cache(maxsize=1)
+def _read_config_data(mtime_ns: int, size: int) -> dict:
+    """Parse the config file. Cached until the file's mtime/size change."""
+    with open(CONFIG_FILE) as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def _load_config_file() -> HomieConfig:
+    """Load configuration from file. Raises FileNotFoundError if missing."""
+    st = CONFIG_FILE.stat()
+
+    # Copy so callers can't mutate the cached data
+    data = dict(_read_config_data(st.st_mtime_ns, st.st_size))
+    if "envs" in data:
+        data["envs"] = dict(data["envs"])
+    # Handle migration from old config format
+    # Remove deprecated fields
+    data.pop("container_image", None)
+    return HomieConfig(**data)
+
+
 def load_config() -> HomieConfig:
     """Load configuration from file, or create default."""
-    if CONFIG_FILE.exists():
-        with open(CONFIG_FILE) as f:
-            data = yaml.safe_load(f) or {}
-        # Handle migration from old config format
-        # Remove deprecated fields
-        data.pop("container_image", None)
-        return HomieConfig(**data)
-    return HomieConfig()
+    try:
+        return _load_config_file()
+    except FileNotFoundError:
+        return HomieConfig()
 
 
 def save_config(config: HomieConfig) -> None:
@@ -62,24 +102,35 @@ def save_config(config: HomieConfig) -> None:
         "name": config.name,
         "discovery_port": config.discovery_port,
         "worker_port": config.worker_port,
+        "worker_max_connections": config.worker_max_connections,
         "group_secret": config.group_secret,
         "container_cpu_limit": config.container_cpu_limit,
         "container_memory_limit": config.container_memory_limit,
         "container_timeout": config.container_timeout,
         "container_network": config.container_network,
+        "container_workspace_root": config.container_workspace_root,
+        "container_tmp_size": config.container_tmp_size,
         "envs": config.envs,
         "default_env": config.default_env,
         "heartbeat_interval": config.heartbeat_interval,
         "peer_timeout": config.peer_timeout,
     }
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(data, f, default_flow_style=False)
+    # Holds the group secret: create it owner-only rather than chmod-ing afterwards.
+    # The mode only applies to new files, so also tighten one left by an
+    # older version before the secret is written to it.
+    fd = os.open(CONFIG_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, 0o600)
+    with os.fdopen(fd, "w") as f:
+        yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False)
 
 
 def get_or_create_config() -> HomieConfig:
     """Get existing config or create and save a new one."""
-    if CONFIG_FILE.exists():
-        return load_config()
+    try:
+        return _load_config_file()
+    except FileNotFoundError:
+        pass
     config = HomieConfig()
     save_config(config)
     return config
@@ -1,20 +1,163 @@
 """Docker container execution with security constraints."""
 
+import codecs
+import heapq
+import itertools
+import mmap
 import os
+import queue
 import shutil
 import tempfile
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Generator, Optional
+from typing import Callable, Generator, Iterable, Optional
 
 import docker
-from docker.types import DeviceRequest
+from docker.types import DeviceRequest, LogConfig
 
 from .jobs import Job, JobResult
 
 
+# Process-wide Docker client shared by all executors
+_docker_client: Optional[docker.DockerClient] = None
+_docker_client_lock = threading.Lock()
+
+# Image used to probe for GPU passthrough
+GPU_PROBE_IMAGE = "nvidia/cuda:12.1-base-ubuntu22.04"
+
+# (checked_at, available) from the last Docker ping
+AVAILABILITY_TTL = 5.0
+_availability_cache: Optional[tuple[float, bool]] = None
+
+
+def get_docker_client() -> docker.DockerClient:
+    """Get the shared Docker client, creating it on first use."""
+    global _docker_client
+    if _docker_client is None:
+        with _docker_client_lock:
+            if _docker_client is None:
+                _docker_client = docker.from_env()
+    return _docker_client
+
+
+class _Deadline:
+    """A container the watchdog will kill unless cancelled first."""
+
+    __slots__ = ("container", "cancelled", "_lock", "_fired", "_killed", "_done")
+
+    def __init__(self, container: docker.models.containers.Container):
+        self.container = container
+        self.cancelled = False
+        self._lock = threading.Lock()  # Decides whether cancel() or fire() won
+        self._fired = False
+        self._killed = False
+        self._done = threading.Event()  # Set once fire() has finished
+
+    def cancel(self) -> bool:
+        """Stop watching. Returns True if the job timed out.
+
+        That's only the case when the watchdog fired first and its kill
+        actually stopped the container; a container that had already exited
+        by itself makes the kill fail, so its own exit status stands.
+        """
+        with self._lock:
+            if not self._fired:
+                self.cancelled = True
+                return False
+        self._done.wait()
+        return self._killed
+
+    def fire(self) -> None:
+        """Kill the container, unless the deadline was cancelled first."""
+        with self._lock:
+            if self.cancelled:
+                return
+            self._fired = True
+        try:
+            self.container.kill()
+            self._killed = True
+        except Exception:
+            pass
+        finally:
+            self._done.set()
+
+
+class _Watchdog:
+    """One thread enforcing timeouts for every running container.
+
+    Replaces a timer thread per job: deadlines sit in a heap and the thread
+    sleeps until the earliest one. Cancelled deadlines are dropped lazily.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, _Deadline]] = []
+        self._seq = itertools.count()  # Tie-breaker so deadlines never compare
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, container: docker.models.containers.Container, timeout: float) -> _Deadline:
+        """Kill container after timeout seconds unless the deadline is cancelled."""
+        deadline = _Deadline(container)
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + timeout, next(self._seq), deadline))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="homie-watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return deadline
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    # Drop deadlines whose jobs already finished
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                _, _, deadline = heapq.heappop(self._heap)
+
+            # Kill outside the lock; it's a Docker API round-trip
+            deadline.fire()
+
+
+_watchdog = _Watchdog()
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """Write data to a new file with unbuffered writes."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        size = len(data)
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                pass  # Not supported by this filesystem
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _read_file(path: str) -> bytes:
+    """Read a whole file through a read-only mapping."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+
 @dataclass
 class OutputChunk:
     """A chunk of output from a running container."""
@@ -31,6 +174,9 @@ class ContainerConfig:
     timeout: int = 600
     network_mode: str = "none"
     pids_limit: int = 100
+    workspace_root: Optional[str] = "/dev/shm"  # Where job workspaces are created
+    tmp_size: str = "100M"  # Size of the container's /tmp tmpfs
+    workspace_pool_size: int = 4  # Empty workspace dirs kept around for reuse
 
 
 class ContainerExecutor:
@@ -38,37 +184,125 @@ class ContainerExecutor:
 
     def __init__(self, config: Optional[ContainerConfig] = None):
         self.config = config or ContainerConfig()
-        self._client: Optional[docker.DockerClient] = None
         self._running_containers: dict[str, docker.models.containers.Container] = {}
         self._container_lock = threading.Lock()
+        self._image_cache: set[str] = set()  # Images known to be present locally
+        self._image_lock = threading.Lock()
+        self._has_gpu: Optional[bool] = None  # Memoized GPU probe result
+        self._workspace_root = self._resolve_workspace_root()
+
+        # Host config settings shared by every job container
+        self._host_config_kwargs = {
+            # Resource limits
+            "nano_cpus": int(self.config.cpu_limit * 1e9),
+            "mem_limit": self.config.memory_limit,
+            "pids_limit": self.config.pids_limit,
+            # Security constraints
+            "network_mode": self.config.network_mode,
+            "read_only": True,
+            "cap_drop": ["ALL"],
+            "security_opt": ["no-new-privileges:true"],
+            # Temporary writable areas
+            "tmpfs": {"/tmp": f"size={self.config.tmp_size},mode=1777"},
+            # Output is read over attach, so skip Docker's json-file logger
+            "log_config": LogConfig(type=LogConfig.types.NONE),
+        }
+
+        # Empty workspaces ready for reuse; used ones are wiped in the background
+        self._workspace_pool: queue.Queue[str] = queue.Queue(maxsize=self.config.workspace_pool_size)
+        self._cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="homie-cleanup")
+
+    def _resolve_workspace_root(self) -> str:
+        """Use the configured workspace root (tmpfs by default) if it's usable."""
+        root = self.config.workspace_root
+        if root and os.path.isdir(root) and os.access(root, os.W_OK | os.X_OK):
+            return root
+        return tempfile.gettempdir()
+
+    def _acquire_workspace(self) -> str:
+        """Take an empty workspace from the pool, or create one."""
+        try:
+            return self._workspace_pool.get_nowait()
+        except queue.Empty:
+            return tempfile.mkdtemp(prefix="homie_ws_", dir=self._workspace_root)
+
+    def _release_workspace(self, workspace: str) -> None:
+        """Wipe a used workspace off the job's critical path and pool it again."""
+        try:
+            self._cleanup_executor.submit(self._recycle_workspace, workspace)
+        except RuntimeError:
+            # Executor shut down
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    def _recycle_workspace(self, workspace: str) -> None:
+        """Empty a workspace and return it to the pool (or delete it if full)."""
+        try:
+            with os.scandir(workspace) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+
+            # Never hand leftovers from one job to the next
+            if not os.listdir(workspace):
+                self._workspace_pool.put_nowait(workspace)
+                return
+        except (OSError, queue.Full):
+            pass
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    def shutdown(self) -> None:
+        """Finish pending workspace cleanup and remove pooled workspaces."""
+        self._cleanup_executor.shutdown(wait=True)
+        while True:
+            try:
+                workspace = self._workspace_pool.get_nowait()
+            except queue.Empty:
+                break
+            shutil.rmtree(workspace, ignore_errors=True)
 
     @property
     def client(self) -> docker.DockerClient:
-        """Lazy-load Docker client."""
-        if self._client is None:
-            self._client = docker.from_env()
-        return self._client
+        """Lazy-load the shared Docker client."""
+        return get_docker_client()
 
     def is_available(self) -> bool:
-        """Check if Docker is available."""
+        """Check if Docker is available (cached for a few seconds)."""
+        global _availability_cache
+        if _availability_cache is not None:
+            checked_at, available = _availability_cache
+            if time.monotonic() - checked_at < AVAILABILITY_TTL:
+                return available
+
         try:
             self.client.ping()
-            return True
+            available = True
         except Exception:
-            return False
+            available = False
+        _availability_cache = (time.monotonic(), available)
+        return available
 
     def has_gpu_support(self) -> bool:
-        """Check if GPU passthrough is available."""
-        try:
-            self.client.containers.run(
-                "nvidia/cuda:12.1-base-ubuntu22.04",
-                "nvidia-smi",
-                device_requests=[DeviceRequest(count=-1, capabilities=[["gpu"]])],
-                remove=True,
-            )
-            return True
-        except Exception:
-            return False
+        """Check if GPU passthrough is available (probed once per executor)."""
+        if self._has_gpu is None:
+            try:
+                self.client.containers.run(
+                    GPU_PROBE_IMAGE,
+                    "nvidia-smi",
+                    device_requests=[DeviceRequest(count=-1, capabilities=[["gpu"]])],
+                    remove=True,
+                )
+                self._has_gpu = True
+                # run() pulled the image if it was missing
+                with self._image_lock:
+                    self._image_cache.add(GPU_PROBE_IMAGE)
+            except Exception:
+                self._has_gpu = False
+        return self._has_gpu
 
     def _get_command(self, job: Job) -> list:
         """Detect how to run the script based on extension."""
@@ -86,138 +320,59 @@ class ContainerExecutor:
         base_cmd = commands.get(ext, ["python", job.filename])
         return base_cmd + job.args
 
-    def _ensure_image(self, image: str) -> None:
-        """Pull image if not available locally."""
-        try:
-            self.client.images.get(image)
-        except docker.errors.ImageNotFound:
-            # Image not found locally, pull it
-            print(f"Pulling image {image}...")
-            self.client.images.pull(image)
-
-    def execute(self, job: Job) -> JobResult:
-        """Execute a job inside a container."""
-        workspace = tempfile.mkdtemp(prefix=f"homie_{job.job_id}_")
-        container = None
-        start_time = time.time()
-
-        try:
-            # Write job files to workspace
-            self._prepare_workspace(workspace, job)
-
-            # Use image from job (sent by mooch)
-            image = job.image
-
-            # Ensure image is available (pull if needed)
-            self._ensure_image(image)
-
-            # Build container run arguments
-            run_kwargs = {
-                "image": image,
-                "command": self._get_command(job),
-                "detach": True,
-                "working_dir": "/workspace",
-                "volumes": {workspace: {"bind": "/workspace", "mode": "rw"}},
-                # Resource limits
-                "nano_cpus": int(self.config.cpu_limit * 1e9),
-                "mem_limit": self.config.memory_limit,
-                "pids_limit": self.config.pids_limit,
-                # Security constraints
-                "network_mode": self.config.network_mode,
-                "read_only": True,
-                "user": "1000:1000",
-                "cap_drop": ["ALL"],
-                "security_opt": ["no-new-privileges:true"],
-                # Temporary writable areas
-                "tmpfs": {"/tmp": "size=100M,mode=1777"},
-                # Environment
-                "environment": {
-                    "HOMIE_JOB_ID": job.job_id,
-                    "PYTHONUNBUFFERED": "1",
-                },
-            }
-
-            # Add GPU support if requested
-            if job.require_gpu:
-                run_kwargs["device_requests"] = [
-                    DeviceRequest(count=-1, capabilities=[["gpu"]])
-                ]
-
-            # Run container
-            container = self.client.containers.run(**run_kwargs)
-
-            # Track container for potential kill
-            with self._container_lock:
-                self._running_containers[job.job_id] = container
+    def warmup(self, images: Iterable[str]) -> None:
+        """Make sure images are present locally before any job needs them.
 
-            # Wait for completion
+        Idempotent; failures are ignored and left for the job to report.
+        """
+        for image in dict.fromkeys(images):
             try:
-                result = container.wait(timeout=self.config.timeout)
-                exit_code = result["StatusCode"]
-                timed_out = False
+                self._ensure_image(image, quiet=True)
             except Exception:
-                container.kill()
-                exit_code = -1
-                timed_out = True
-
-            # Collect output
-            stdout = container.logs(stdout=True, stderr=False).decode("utf-8", errors="replace")
-            stderr = container.logs(stdout=False, stderr=True).decode("utf-8", errors="replace")
+                pass
 
-            # Collect output files
-            output_files = self._collect_outputs(workspace, job)
+    def _ensure_image(self, image: str, quiet: bool = False) -> None:
+        """Pull image if not available locally."""
+        # Skip the Docker API round-trip for images we've already verified
+        if image in self._image_cache:
+            return
 
-            runtime = time.time() - start_time
+        with self._image_lock:
+            # Another job may have pulled it while we waited
+            if image in self._image_cache:
+                return
 
-            return JobResult(
-                job_id=job.job_id,
-                exit_code=exit_code,
-                stdout=stdout,
-                stderr=stderr,
-                output_files=output_files,
-                runtime_seconds=runtime,
-                error="Execution timed out" if timed_out else None,
-            )
-
-        except docker.errors.ContainerError as e:
-            return JobResult(
-                job_id=job.job_id,
-                exit_code=e.exit_status,
-                stdout="",
-                stderr=str(e),
-                runtime_seconds=time.time() - start_time,
-                error=str(e),
-            )
-        except docker.errors.ImageNotFound as e:
-            return JobResult(
-                job_id=job.job_id,
-                exit_code=-1,
-                stdout="",
-                stderr="",
-                runtime_seconds=0,
-                error=f"Docker image not found: {e}",
-            )
-        except Exception as e:
-            return JobResult(
-                job_id=job.job_id,
-                exit_code=-1,
-                stdout="",
-                stderr="",
-                runtime_seconds=time.time() - start_time,
-                error=str(e),
-            )
-        finally:
-            # Remove from tracking
-            with self._container_lock:
-                self._running_containers.pop(job.job_id, None)
+            try:
+                self.client.images.get(image)
+            except docker.errors.ImageNotFound:
+                # Image not found locally, pull it
+                if not quiet:
+                    print(f"Pulling image {image}...")
+                self.client.images.pull(image)
+
+            self._image_cache.add(image)
+
+    def invalidate_image_cache(self, image: Optional[str] = None) -> None:
+        """Forget verified images so the next job re-checks with Docker."""
+        with self._image_lock:
+            if image is None:
+                self._image_cache.clear()
+            else:
+                self._image_cache.discard(image)
+
+    def _start_watchdog(
+        self, container: docker.models.containers.Container
+    ) -> _Deadline:
+        """Kill the container if it outlives the timeout.
+
+        Returns the deadline; cancel it once the container exits, which
+        reports whether the timeout killed it.
+        """
+        return _watchdog.watch(container, self.config.timeout)
 
-            # Cleanup
-            if container:
-                try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-            shutil.rmtree(workspace, ignore_errors=True)
+    def execute(self, job: Job) -> JobResult:
+        """Execute a job inside a container."""
+        return self._execute(job)
 
     def execute_streaming(
         self,
@@ -233,13 +388,21 @@ class ContainerExecutor:
         Returns:
             JobResult with final execution info
         """
-        workspace = tempfile.mkdtemp(prefix=f"homie_{job.job_id}_")
+        return self._execute(job, on_output)
+
+    def _execute(
+        self,
+        job: Job,
+        on_output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> JobResult:
+        """Run a job to completion, optionally streaming output via on_output."""
+        workspace = self._acquire_workspace()
         container = None
         start_time = time.time()
 
         try:
             # Write job files to workspace
-            self._prepare_workspace(workspace, job)
+            input_paths = self._prepare_workspace(workspace, job)
 
             # Use image from job (sent by mooch)
             image = job.image
@@ -247,117 +410,59 @@ class ContainerExecutor:
             # Ensure image is available (pull if needed)
             self._ensure_image(image)
 
-            # Build container run arguments
-            run_kwargs = {
-                "image": image,
-                "command": self._get_command(job),
-                "detach": True,
-                "working_dir": "/workspace",
-                "volumes": {workspace: {"bind": "/workspace", "mode": "rw"}},
-                # Resource limits
-                "nano_cpus": int(self.config.cpu_limit * 1e9),
-                "mem_limit": self.config.memory_limit,
-                "pids_limit": self.config.pids_limit,
-                # Security constraints
-                "network_mode": self.config.network_mode,
-                "read_only": True,
-                "user": "1000:1000",
-                "cap_drop": ["ALL"],
-                "security_opt": ["no-new-privileges:true"],
-                # Temporary writable areas
-                "tmpfs": {"/tmp": "size=100M,mode=1777"},
-                # Environment
-                "environment": {
+            # Host config: static limits/security precomputed in __init__,
+            # plus this job's workspace mount and GPU request
+            host_config = self.client.api.create_host_config(
+                binds={workspace: {"bind": "/workspace", "mode": "rw"}},
+                device_requests=(
+                    [DeviceRequest(count=-1, capabilities=[["gpu"]])]
+                    if job.require_gpu else None
+                ),
+                **self._host_config_kwargs,
+            )
+
+            # Create container (started once we're attached) through the
+            # low-level API, skipping the high-level wrapper's argument
+            # translation and its follow-up inspect call
+            response = self.client.api.create_container(
+                image=image,
+                command=self._get_command(job),
+                detach=True,
+                working_dir="/workspace",
+                volumes=["/workspace"],
+                user="1000:1000",
+                environment={
                     "HOMIE_JOB_ID": job.job_id,
                     "PYTHONUNBUFFERED": "1",
                 },
-            }
-
-            # Add GPU support if requested
-            if job.require_gpu:
-                run_kwargs["device_requests"] = [
-                    DeviceRequest(count=-1, capabilities=[["gpu"]])
-                ]
-
-            # Run container
-            container = self.client.containers.run(**run_kwargs)
+                host_config=host_config,
+            )
+            container = self.client.containers.prepare_model({"Id": response["Id"]})
 
             # Track container for potential kill
             with self._container_lock:
                 self._running_containers[job.job_id] = container
 
-            # Stream logs in real-time
-            timed_out = False
-            stdout_full = []
-            stderr_full = []
-
-            try:
-                # Use logs with stream=True to get output as it happens
-                # We use a separate thread to handle timeout
-                log_stream = container.logs(
-                    stdout=True,
-                    stderr=True,
-                    stream=True,
-                    follow=True
-                )
-
-                # Docker demultiplexes stdout/stderr when using stream=True with TTY=False
-                # Each chunk is prefixed with 8-byte header: [stream_type(1), 0, 0, 0, size(4)]
-                for chunk in log_stream:
-                    # Decode the chunk
-                    text = chunk.decode("utf-8", errors="replace")
-                    if text:
-                        # Docker SDK with stream=True gives us raw bytes
-                        # When TTY is false (our case), it's mixed but we treat as stdout
-                        stdout_full.append(text)
-                        on_output(OutputChunk(stream="stdout", data=text))
-
-                    # Check if container is still running
-                    container.reload()
-                    if container.status != "running":
-                        break
-
-            except Exception as e:
-                # Timeout or other error during streaming
-                if "timed out" in str(e).lower():
-                    timed_out = True
-                    try:
-                        container.kill()
-                    except Exception:
-                        pass
-
-            # Get final exit code
-            try:
-                container.reload()
-                exit_code = container.attrs.get("State", {}).get("ExitCode", -1)
-            except Exception:
-                exit_code = -1
+            exit_code, stdout, stderr, timed_out = self._run_attached(container, on_output)
 
             # Collect output files
-            output_files = self._collect_outputs(workspace, job)
+            output_files = self._collect_outputs(workspace, input_paths)
 
             runtime = time.time() - start_time
 
             return JobResult(
                 job_id=job.job_id,
                 exit_code=exit_code,
-                stdout="".join(stdout_full),
-                stderr="".join(stderr_full),
+                stdout=stdout,
+                stderr=stderr,
                 output_files=output_files,
                 runtime_seconds=runtime,
                 error="Execution timed out" if timed_out else None,
             )
 
-        except docker.errors.ContainerError as e:
-            return JobResult(
-                job_id=job.job_id,
-                exit_code=e.exit_status,
-                stdout="",
-                stderr=str(e),
-                runtime_seconds=time.time() - start_time,
-                error=str(e),
-            )
         except docker.errors.ImageNotFound as e:
+            # The image was removed after we verified it; re-check next time
+            self.invalidate_image_cache(job.image)
             return JobResult(
                 job_id=job.job_id,
                 exit_code=-1,
@@ -386,7 +491,67 @@ class ContainerExecutor:
                     container.remove(force=True)
                 except Exception:
                     pass
-            shutil.rmtree(workspace, ignore_errors=True)
+            self._release_workspace(workspace)
+
+    def _run_attached(
+        self,
+        container: docker.models.containers.Container,
+        on_output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> tuple[int, str, str, bool]:
+        """Start a created container and wait for it to exit.
+
+        stdout/stderr come over a single demuxed attach connection, read by a
+        background thread while this thread blocks in wait(). Attaching
+        before start means no output is missed, since there's no log driver
+        to replay it from.
+
+        Returns:
+            (exit_code, stdout, stderr, timed_out)
+        """
+        output = container.attach(stdout=True, stderr=True, stream=True, demux=True)
+        stdout_buf = []
+        stderr_buf = []
+
+        def pump() -> None:
+            # Incremental decoders so multi-byte characters split across
+            # chunks aren't mangled
+            decoders = {
+                "stdout": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+                "stderr": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+            }
+            try:
+                for out, err in output:
+                    for stream, data, buf in (("stdout", out, stdout_buf), ("stderr", err, stderr_buf)):
+                        if not data:
+                            continue
+                        buf.append(data)
+                        if on_output:
+                            text = decoders[stream].decode(data)
+                            if text:
+                                on_output(OutputChunk(stream=stream, data=text))
+            except Exception:
+                # Stream dropped; the exit code tells us what happened
+                pass
+
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+
+        deadline = self._start_watchdog(container)
+        try:
+            container.start()
+            # Returns once the container exits (or the watchdog kills it)
+            status = container.wait()
+        finally:
+            timed_out = deadline.cancel()
+
+        # The attach stream ends with the container; wait for the tail
+        reader.join(timeout=5.0)
+
+        exit_code = -1 if timed_out else status.get("StatusCode", -1)
+
+        stdout = b"".join(stdout_buf).decode("utf-8", errors="replace")
+        stderr = b"".join(stderr_buf).decode("utf-8", errors="replace")
+        return exit_code, stdout, stderr, timed_out
 
     def kill_job(self, job_id: str) -> bool:
         """Kill a running job by ID. Returns True if killed, False if not found."""
@@ -406,36 +571,60 @@ class ContainerExecutor:
         with self._container_lock:
             return list(self._running_containers.keys())
 
-    def _prepare_workspace(self, workspace: str, job: Job) -> None:
-        """Write job files to workspace directory."""
-        # Write main script
-        script_path = os.path.join(workspace, job.filename)
-        with open(script_path, "wb") as f:
-            f.write(job.code)
+    def _prepare_workspace(self, workspace: str, job: Job) -> set[str]:
+        """Write job files to workspace directory.
 
-        # Write additional files
+        Returns:
+            Workspace-relative paths of the input files
+        """
+        # Main script first, then additional files
+        files = {os.path.join(workspace, job.filename): job.code}
         for filename, content in job.files.items():
-            file_path = os.path.join(workspace, filename)
-            os.makedirs(os.path.dirname(file_path) if "/" in filename else workspace, exist_ok=True)
-            with open(file_path, "wb") as f:
-                f.write(content)
+            files[os.path.join(workspace, filename)] = content
+
+        # Create each subdirectory once up front rather than once per file
+        subdirs = {os.path.dirname(path) for path in files} - {workspace}
+        for subdir in sorted(subdirs):
+            os.makedirs(subdir, exist_ok=True)
+
+        for path, content in files.items():
+            _write_file(path, content)
 
-    def _collect_outputs(self, workspace: str, job: Job) -> dict[str, bytes]:
-        """Collect output files from workspace."""
+        return {os.path.relpath(path, workspace) for path in files}
+
+    def _collect_outputs(self, workspace: str, input_paths: set[str]) -> dict[str, bytes]:
+        """Collect output files from workspace.
+
+        Input files are never sent back, even if the job modified them: the
+        client writes outputs into the caller's directory, where they would
+        overwrite the originals.
+        """
         outputs = {}
-        input_files = {job.filename} | set(job.files.keys())
+        pending = [workspace]
 
-        for root, _, files in os.walk(workspace):
-            for filename in files:
-                filepath = os.path.join(root, filename)
-                relpath = os.path.relpath(filepath, workspace)
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            for entry in entries:
+                # Don't follow links out of the workspace
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
 
                 # Skip input files, only collect new outputs
-                if relpath not in input_files:
-                    try:
-                        with open(filepath, "rb") as f:
-                            outputs[relpath] = f.read()
-                    except Exception:
-                        pass
+                relpath = os.path.relpath(entry.path, workspace)
+                if relpath in input_paths:
+                    continue
+
+                try:
+                    outputs[relpath] = _read_file(entry.path)
+                except Exception:
+                    pass
 
         return outputs
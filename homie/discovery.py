@@ -1,19 +1,29 @@
 """UDP broadcast discovery and peer tracking."""
 
-import hashlib
+import dataclasses
+import heapq
 import hmac
 import json
+import operator
+import os
+import selectors
 import socket
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
+from . import fastjson
 from .config import HomieConfig
 from .utils import get_local_ip, get_system_stats
 
 
-@dataclass
+# Seconds without a heartbeat before a peer is considered gone
+# (more forgiving than peer_timeout, for flaky wifi)
+PEER_ALIVE_TIMEOUT = 30.0
+
+
+@dataclass(slots=True)
 class Peer:
     """A peer on the network."""
 
@@ -31,7 +41,7 @@ class Peer:
     @property
     def is_alive(self) -> bool:
         """Check if peer is still alive (seen within timeout)."""
-        return time.time() - self.last_seen < 30.0  # 30 sec timeout (more forgiving for flaky wifi)
+        return time.time() - self.last_seen < PEER_ALIVE_TIMEOUT
 
     def to_dict(self) -> dict:
         return {
@@ -47,13 +57,35 @@ class Peer:
         }
 
 
-def sign_heartbeat(data: dict, secret: str) -> str:
-    """Sign heartbeat data with group secret."""
-    msg = json.dumps(data, sort_keys=True).encode()
-    return hmac.new(secret.encode(), msg, hashlib.sha256).hexdigest()
+# Fields a heartbeat must carry to be turned into a Peer
+_HEARTBEAT_KEYS = frozenset(
+    ("name", "ip", "port", "cpu_percent_used", "ram_free_gb", "ram_total_gb", "status")
+)
+
+
+def _sign_message(msg: bytes, secret: Union[str, hmac.HMAC]) -> str:
+    """Sign an encoded heartbeat body.
+
+    secret may be the group secret or a keyed HMAC template
+    (HomieConfig.hmac_template), which is copied to skip key setup.
+    """
+    if isinstance(secret, str):
+        return hmac.new(secret.encode(), msg, "sha256").hexdigest()
+    mac = secret.copy()
+    mac.update(msg)
+    return mac.hexdigest()
 
 
-def verify_heartbeat(data: dict, signature: str, secret: str) -> bool:
+def sign_heartbeat(data: dict, secret: Union[str, hmac.HMAC]) -> str:
+    """Sign heartbeat data with group secret.
+
+    The signed body is always stdlib json.dumps(sort_keys=True) so that
+    peers with and without orjson agree on the bytes.
+    """
+    return _sign_message(json.dumps(data, sort_keys=True).encode(), secret)
+
+
+def verify_heartbeat(data: dict, signature: str, secret: Union[str, hmac.HMAC]) -> bool:
     """Verify heartbeat signature."""
     expected = sign_heartbeat(data, secret)
     return hmac.compare_digest(expected, signature)
@@ -67,13 +99,20 @@ class Discovery:
         config: HomieConfig,
         on_peer_joined: Optional[Callable[[Peer], None]] = None,
         on_peer_left: Optional[Callable[[Peer], None]] = None,
+        on_peers_changed: Optional[Callable[[], None]] = None,
     ):
         self.config = config
         self.on_peer_joined = on_peer_joined
         self.on_peer_left = on_peer_left
+        self.on_peers_changed = on_peers_changed  # Called after any bump of version
 
         self._peers: dict[str, Peer] = {}
+        self.version = 0  # Bumped whenever the peer table changes, for cheap change detection
+        self._sorted_peers: list[Peer] = []  # _peers sorted by name, as of _sorted_version
+        self._sorted_version = -1
+        self._expire_heap: list[tuple[float, str]] = []  # (expiry time, peer name)
         self._direct_peers: list[str] = []  # List of IPs to send direct heartbeats to
+        self._targets: list[tuple[str, int]] = []  # Heartbeat destinations (broadcast + direct)
         self._lock = threading.Lock()
         self._running = False
         self._status = "idle"
@@ -85,8 +124,14 @@ class Discovery:
         self._broadcast_socket: Optional[socket.socket] = None
         self._listen_socket: Optional[socket.socket] = None
 
+        # Lets stop() wake the loops immediately instead of on their next tick
+        self._stop_event = threading.Event()
+        self._wakeup_r: Optional[socket.socket] = None
+        self._wakeup_w: Optional[socket.socket] = None
+
         # Load direct peers from config file
         self._load_direct_peers()
+        self._rebuild_targets()
 
     def start(self, listen: bool = True) -> None:
         """Start the discovery service.
@@ -105,6 +150,7 @@ class Discovery:
         self._broadcast_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._broadcast_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
         self._broadcast_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._broadcast_socket.setblocking(False)  # One unreachable peer mustn't stall the rest
 
         if listen:
             # Full listen mode - bind to port (for homie up)
@@ -112,14 +158,16 @@ class Discovery:
             self._listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self._listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
             self._listen_socket.bind(("", self.config.discovery_port))
-            self._listen_socket.settimeout(1.0)
         else:
             # Client mode - use a random port to receive responses
             self._listen_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self._listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self._listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
             self._listen_socket.bind(("", 0))  # Random available port
-            self._listen_socket.settimeout(1.0)
+        self._listen_socket.setblocking(False)
+
+        self._stop_event.clear()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
 
         # Start threads
         self._broadcast_thread = threading.Thread(target=self._broadcast_loop, daemon=True)
@@ -133,6 +181,12 @@ class Discovery:
     def stop(self) -> None:
         """Stop the discovery service."""
         self._running = False
+        self._stop_event.set()
+        if self._wakeup_w:
+            try:
+                self._wakeup_w.send(b"\0")
+            except OSError:
+                pass
 
         if self._broadcast_socket:
             self._broadcast_socket.close()
@@ -145,12 +199,16 @@ class Discovery:
 
     def get_peers(self) -> list[Peer]:
         """Get list of all known alive peers."""
+        cutoff = time.time() - PEER_ALIVE_TIMEOUT
         with self._lock:
-            return [p for p in self._peers.values() if p.is_alive]
+            # Re-sort only when the peer table actually changed
+            if self._sorted_version != self.version:
+                self._sorted_peers = sorted(self._peers.values(), key=operator.attrgetter("name"))
+                self._sorted_version = self.version
+            return [p for p in self._sorted_peers if p.last_seen > cutoff]
 
     def write_peer_cache(self) -> None:
         """Write current peers to cache file for other commands to read."""
-        import json
         from pathlib import Path
 
         peers = self.get_peers()
@@ -175,7 +233,7 @@ class Discovery:
 
         cache_file = Path.home() / ".homie" / "peer_cache.json"
         cache_file.parent.mkdir(parents=True, exist_ok=True)
-        cache_file.write_text(json.dumps(cache_data))
+        cache_file.write_bytes(fastjson.dumps(cache_data))
 
     def get_peer(self, name: str) -> Optional[Peer]:
         """Get a specific peer by name."""
@@ -184,26 +242,32 @@ class Discovery:
             return peer if peer and peer.is_alive else None
 
     def get_best_peer(self, require_gpu: bool = False) -> Optional[Peer]:
-        """Get the best available peer for running a job."""
-        peers = self.get_peers()
-
-        # Filter by status and GPU requirement
-        available = [
-            p for p in peers
-            if p.status == "idle" and (not require_gpu or p.gpu_name)
-        ]
-
-        if not available:
-            return None
+        """Get the best available peer for running a job.
 
-        # Score peers: prefer more free RAM, less CPU usage
-        def score(p: Peer) -> float:
-            ram_score = p.ram_free_gb
-            cpu_score = (100 - p.cpu_percent_used) / 100
-            gpu_bonus = 2.0 if p.gpu_name and require_gpu else 0
-            return ram_score * cpu_score + gpu_bonus
+        Scores peers by free RAM weighted by idle CPU (plus a bonus for a GPU
+        when one is required) in a single pass over the peer table.
+        """
+        cutoff = time.time() - PEER_ALIVE_TIMEOUT
+        best = None
+        best_score = float("-inf")
 
-        return max(available, key=score)
+        with self._lock:
+            for p in self._peers.values():
+                # Filter by liveness, status and GPU requirement
+                if p.last_seen <= cutoff or p.status != "idle":
+                    continue
+                gpu_name = p.gpu_name
+                if require_gpu and not gpu_name:
+                    continue
+
+                # Score peers: prefer more free RAM, less CPU usage
+                score = p.ram_free_gb * (100 - p.cpu_percent_used) / 100
+                if gpu_name and require_gpu:
+                    score += 2.0
+                if score > best_score:
+                    best, best_score = p, score
+
+        return best
 
     def _build_heartbeat(self) -> dict:
         """Build heartbeat message."""
@@ -236,7 +300,16 @@ class Discovery:
             self._direct_peers.append(ip)
             peers_file = Path.home() / ".homie" / "peers"
             peers_file.parent.mkdir(parents=True, exist_ok=True)
-            peers_file.write_text("\n".join(self._direct_peers) + "\n")
+            # Append one line rather than rewriting the whole list
+            with open(peers_file, "ab+") as f:
+                prefix = b""
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    # Don't glue onto a hand-edited last line without a newline
+                    if f.read(1) != b"\n":
+                        prefix = b"\n"
+                f.write(prefix + ip.encode() + b"\n")
+            self._rebuild_targets()
 
     def remove_direct_peer(self, ip: str) -> None:
         """Remove a direct peer IP."""
@@ -248,61 +321,96 @@ class Discovery:
                 peers_file.write_text("\n".join(self._direct_peers) + "\n")
             elif peers_file.exists():
                 peers_file.unlink()
+            self._rebuild_targets()
+
+    def _rebuild_targets(self) -> None:
+        """Precompute heartbeat destination addresses."""
+        port = self.config.discovery_port
+        # Broadcast (for networks that support it), then known peers directly
+        # (for networks that block broadcast)
+        self._targets = [("<broadcast>", port)] + [(ip, port) for ip in self._direct_peers]
 
     def _broadcast_loop(self) -> None:
-        """Broadcast heartbeat periodically."""
+        """Broadcast heartbeat periodically.
+
+        Ticks are scheduled at a fixed rate, so the time spent gathering
+        stats and sending doesn't stretch the heartbeat period.
+        """
+        next_tick = time.monotonic()
         while self._running:
             try:
                 heartbeat = self._build_heartbeat()
-                signature = sign_heartbeat(heartbeat, self.config.group_secret)
 
-                message = json.dumps({"heartbeat": heartbeat, "sig": signature}).encode()
+                # Serialize once: the signed body is spliced into the envelope as-is
+                body = json.dumps(heartbeat, sort_keys=True).encode()
+                signature = _sign_message(body, self.config.hmac_template)
+                message = b'{"heartbeat": ' + body + b', "sig": "' + signature.encode() + b'"}'
 
-                # Send broadcast (for networks that support it)
-                self._broadcast_socket.sendto(
-                    message,
-                    ("<broadcast>", self.config.discovery_port),
-                )
-
-                # Also send directly to known peers (for networks that block broadcast)
-                for peer_ip in self._direct_peers:
+                sendto = self._broadcast_socket.sendto
+                for target in self._targets:
                     try:
-                        self._broadcast_socket.sendto(
-                            message,
-                            (peer_ip, self.config.discovery_port),
-                        )
-                    except Exception:
+                        sendto(message, target)
+                    except OSError:  # incl. BlockingIOError when the send buffer is full
                         pass
             except Exception:
                 pass
 
-            time.sleep(self.config.heartbeat_interval)
+            next_tick += self.config.heartbeat_interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Fell behind (e.g. slow stats); skip missed ticks rather than burst
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
 
     def _listen_loop(self) -> None:
-        """Listen for heartbeats from other peers."""
-        while self._running:
-            try:
-                data, addr = self._listen_socket.recvfrom(4096)
-                self._handle_message(data, addr)
-            except socket.timeout:
-                continue
-            except Exception:
-                pass
+        """Listen for heartbeats from other peers.
+
+        Blocks in select() until a datagram arrives or stop() writes to the
+        wakeup socket, so an idle node makes no periodic syscalls.
+        """
+        listen_socket = self._listen_socket
+        wakeup_r = self._wakeup_r
+        try:
+            with selectors.DefaultSelector() as sel:
+                sel.register(listen_socket, selectors.EVENT_READ)
+                sel.register(wakeup_r, selectors.EVENT_READ)
+
+                while self._running:
+                    for key, _ in sel.select():
+                        if key.fileobj is wakeup_r:
+                            return
+                        # Drain everything that's queued
+                        while True:
+                            try:
+                                data, addr = listen_socket.recvfrom(4096)
+                            except BlockingIOError:
+                                break
+                            self._handle_message(data, addr)
+        except (OSError, ValueError):
+            # Socket closed under us by stop()
+            pass
+        finally:
+            wakeup_r.close()
+            self._wakeup_w.close()
 
     def _handle_message(self, data: bytes, addr: tuple) -> None:
         """Handle incoming heartbeat message."""
         try:
-            payload = json.loads(data.decode())
+            payload = fastjson.loads(data)
             heartbeat = payload.get("heartbeat", {})
             signature = payload.get("sig", "")
 
-            # Verify signature
-            if not verify_heartbeat(heartbeat, signature, self.config.group_secret):
-                return  # Invalid signature, ignore
-
+            # Cheap checks first so self-echoes and junk skip the HMAC.
             # Ignore our own broadcasts
             if heartbeat.get("name") == self.config.name:
                 return
+            if not signature or not _HEARTBEAT_KEYS.issubset(heartbeat):
+                return
+
+            # Verify signature
+            if not verify_heartbeat(heartbeat, signature, self.config.hmac_template):
+                return  # Invalid signature, ignore
 
             peer = Peer(
                 name=heartbeat["name"],
@@ -318,26 +426,47 @@ class Discovery:
             )
 
             with self._lock:
-                is_new = peer.name not in self._peers
-                self._peers[peer.name] = peer
+                old = self._peers.get(peer.name)
+                is_new = old is None
+                changed = is_new or dataclasses.replace(old, last_seen=peer.last_seen) != peer
+                if changed:
+                    self._peers[peer.name] = peer
+                    self.version += 1
+                else:
+                    # Only last_seen moved: refresh in place so the sorted
+                    # view and the version stay valid
+                    old.last_seen = peer.last_seen
+                heapq.heappush(self._expire_heap, (peer.last_seen + PEER_ALIVE_TIMEOUT, peer.name))
 
             if is_new and self.on_peer_joined:
                 self.on_peer_joined(peer)
+            if changed and self.on_peers_changed:
+                self.on_peers_changed()
 
         except Exception:
             pass
 
     def _cleanup_loop(self) -> None:
-        """Remove dead peers periodically."""
+        """Remove dead peers as their heartbeats expire."""
         while self._running:
-            time.sleep(self.config.peer_timeout / 2)
-
+            version = self.version
             with self._lock:
-                dead_peers = [
-                    name for name, peer in self._peers.items()
-                    if not peer.is_alive
-                ]
-                for name in dead_peers:
-                    peer = self._peers.pop(name)
+                now = time.time()
+                heap = self._expire_heap
+                while heap and heap[0][0] <= now:
+                    _, name = heapq.heappop(heap)
+                    peer = self._peers.get(name)
+                    # Stale entry if the peer has been heard from since
+                    if peer is None or peer.is_alive:
+                        continue
+                    del self._peers[name]
+                    self.version += 1
                     if self.on_peer_left:
                         self.on_peer_left(peer)
+
+                # Sleep until the next expiry; heartbeats only push later ones
+                delay = heap[0][0] - now if heap else self.config.peer_timeout / 2
+
+            if self.version != version and self.on_peers_changed:
+                self.on_peers_changed()
+            self._stop_event.wait(max(delay, 0.1))
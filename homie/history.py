@@ -1,10 +1,19 @@
 """Job history tracking for Homie Compute."""
 
 import json
+import mmap
+import os
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 
 HISTORY_FILE = Path.home() / ".homie" / "job_history.jsonl"
@@ -86,6 +95,30 @@ def ensure_history_file() -> None:
         HISTORY_FILE.touch()
 
 
+@contextmanager
+def _history_lock(exclusive: bool = False) -> Iterator[None]:
+    """Hold the history lock: shared for appends, exclusive for compaction.
+
+    Appends don't need to exclude each other (O_APPEND does that); the lock
+    keeps compaction from swapping the file out under an append in flight.
+    """
+    with open(HISTORY_FILE.with_suffix(".lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            # No shared locks on Windows; lock the first byte exclusively
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def append_job_start(
     job_id: str,
     sender: str,
@@ -95,8 +128,13 @@ def append_job_start(
     image: str,
     require_gpu: bool,
     role: str,
+    start_time: Optional[float] = None,
 ) -> None:
-    """Record a job start in history."""
+    """Record a job start in history.
+
+    start_time defaults to now; pass it when the caller already took the
+    timestamp so both records agree.
+    """
     ensure_history_file()
 
     entry = JobHistoryEntry(
@@ -108,10 +146,10 @@ def append_job_start(
         image=image,
         require_gpu=require_gpu,
         role=role,
-        start_time=time.time(),
+        start_time=time.time() if start_time is None else start_time,
     )
 
-    with open(HISTORY_FILE, "a") as f:
+    with _history_lock(), open(HISTORY_FILE, "a") as f:
         f.write(json.dumps(entry.to_dict()) + "\n")
 
 
@@ -122,30 +160,206 @@ def update_job_completion(
     error: Optional[str] = None,
     output_file_count: int = 0,
 ) -> None:
-    """Update a job entry with completion info."""
+    """Record completion info for a job.
+
+    Completions are appended as update records rather than rewriting the
+    file; read_history() folds them onto the matching start record, and
+    the file is compacted here once enough of them pile up.
+    """
     ensure_history_file()
 
-    # Read all entries
-    entries = read_history()
+    update = {
+        "job_id": job_id,
+        "_update": True,
+        "end_time": time.time(),
+        "runtime_seconds": runtime_seconds,
+        "exit_code": exit_code,
+        "success": exit_code == 0 and error is None,
+        "error": error,
+        "output_file_count": output_file_count,
+    }
+
+    # One write() on an O_APPEND file, so concurrent writers don't interleave
+    with _history_lock(), open(HISTORY_FILE, "a", buffering=1 << 16) as f:
+        f.write(json.dumps(update) + "\n")
+
+    _compact_history()
 
-    # Find and update the matching entry
-    updated = False
-    for entry in reversed(entries):  # Search from end (most recent)
-        if entry.job_id == job_id and entry.end_time is None:
-            entry.end_time = time.time()
-            entry.runtime_seconds = runtime_seconds
-            entry.exit_code = exit_code
-            entry.success = exit_code == 0 and error is None
-            entry.error = error
-            entry.output_file_count = output_file_count
-            updated = True
-            break
 
-    if updated:
-        # Rewrite the file with updated entries
+def _compact_history() -> None:
+    """Fold update records into their starts once the file has grown.
+
+    Also puts files written newest-first by older versions back in order.
+    Runs under the exclusive lock so no concurrent append is lost when the
+    rewritten file replaces the old one.
+    """
+    with _history_lock(exclusive=True):
+        try:
+            with open(HISTORY_FILE, "rb") as f:
+                line_count = f.read().count(b"\n")
+            if line_count <= 2 * MAX_HISTORY_ENTRIES and not _is_newest_first():
+                return
+            records, _ = _load_records()
+        except FileNotFoundError:
+            return
+
+        entries = []
+        for data in records:
+            try:
+                entries.append(JobHistoryEntry.from_dict(data))
+            except (KeyError, TypeError):
+                continue
         _write_history(entries)
 
 
+def _load_records() -> tuple[list[dict], int]:
+    """Read the history file and fold update records onto their start records.
+
+    Returns:
+        (job dicts in file order, number of lines read)
+    """
+    records: list[dict] = []
+    open_jobs: dict[str, list[dict]] = {}  # job_id -> start records without a completion
+    line_count = 0
+
+    with open(HISTORY_FILE, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            line_count += 1
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            if data.pop("_update", False):
+                # Completions match the most recent open start for the job
+                starts = open_jobs.get(data.get("job_id"))
+                if starts:
+                    starts.pop().update(data)
+            else:
+                records.append(data)
+                if data.get("end_time") is None:
+                    open_jobs.setdefault(data.get("job_id"), []).append(data)
+
+    return records, line_count
+
+
+def _iter_lines_reverse(path: Path) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file from last to first."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b"\n", 0, end) + 1
+                line = mm[start:end].strip()
+                if line:
+                    yield line
+                end = start - 1
+
+
+def _is_newest_first() -> bool:
+    """Whether the history file is in descending start order.
+
+    Older versions rewrote the whole file newest-first on every completion;
+    current ones append, so the first two start records tell them apart.
+    """
+    start_times: list[float] = []
+    with open(HISTORY_FILE, "rb") as f:
+        for line in f:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(data, dict) or data.get("_update"):
+                continue
+            start_time = data.get("start_time")
+            if not isinstance(start_time, (int, float)):
+                continue
+            start_times.append(start_time)
+            if len(start_times) == 2:
+                return start_times[0] > start_times[1]
+    return False
+
+
+def _matches(
+    entry: JobHistoryEntry,
+    role: Optional[str],
+    peer: Optional[str],
+    success_only: bool,
+    failed_only: bool,
+    since: Optional[float],
+) -> bool:
+    """Check an entry against the read_history() filters."""
+    if role and entry.role != role:
+        return False
+    if peer and entry.peer != peer:
+        return False
+    if success_only and not entry.success:
+        return False
+    if failed_only and entry.success:
+        return False
+    if since and entry.start_time < since:
+        return False
+    return True
+
+
+def _read_recent(
+    limit: int,
+    role: Optional[str],
+    peer: Optional[str],
+    success_only: bool,
+    failed_only: bool,
+    since: Optional[float],
+) -> list[JobHistoryEntry]:
+    """Read the newest matching entries by walking the file backwards.
+
+    Entries are appended in start order, so this stops after `limit`
+    matches (or once it passes `since`) without parsing the rest.
+    """
+    entries: list[JobHistoryEntry] = []
+    # job_id -> completion records not yet matched to a start record.
+    # Walking backwards, the last one pushed is the earliest in the file.
+    pending: dict[str, list[dict]] = {}
+
+    for line in _iter_lines_reverse(HISTORY_FILE):
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(data, dict):
+            continue
+
+        if data.pop("_update", False):
+            pending.setdefault(data.get("job_id"), []).append(data)
+            continue
+
+        if data.get("end_time") is None:
+            updates = pending.get(data.get("job_id"))
+            if updates:
+                data.update(updates.pop())
+
+        try:
+            entry = JobHistoryEntry.from_dict(data)
+        except (KeyError, TypeError):
+            # Skip malformed entries
+            continue
+
+        if since and entry.start_time < since:
+            break
+        if _matches(entry, role, peer, success_only, failed_only, since):
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+
+    return entries
+
+
 def read_history(
     limit: Optional[int] = None,
     role: Optional[str] = None,
@@ -169,43 +383,38 @@ def read_history(
     """
     ensure_history_file()
 
-    entries = []
+    if limit:
+        try:
+            # The backwards walk relies on ascending order; files from older
+            # versions take the full scan below until they're compacted
+            if not _is_newest_first():
+                return _read_recent(limit, role, peer, success_only, failed_only, since)
+        except FileNotFoundError:
+            return []
+
     try:
-        with open(HISTORY_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    entry = JobHistoryEntry.from_dict(data)
-
-                    # Apply filters
-                    if role and entry.role != role:
-                        continue
-                    if peer and entry.peer != peer:
-                        continue
-                    if success_only and not entry.success:
-                        continue
-                    if failed_only and entry.success:
-                        continue
-                    if since and entry.start_time < since:
-                        continue
-
-                    entries.append(entry)
-                except (json.JSONDecodeError, KeyError, TypeError):
-                    # Skip malformed entries
-                    continue
+        records, _ = _load_records()
     except FileNotFoundError:
         return []
 
+    all_entries = []
+    for data in records:
+        try:
+            all_entries.append(JobHistoryEntry.from_dict(data))
+        except (KeyError, TypeError):
+            # Skip malformed entries
+            continue
+
+    entries = [
+        entry for entry in all_entries
+        if _matches(entry, role, peer, success_only, failed_only, since)
+    ]
+
     # Sort by start time, newest first
     entries.sort(key=lambda e: e.start_time, reverse=True)
 
-    # Apply limit
     if limit:
         entries = entries[:limit]
-
     return entries
 
 
@@ -251,14 +460,23 @@ def get_history_stats() -> dict:
 
 
 def _write_history(entries: list[JobHistoryEntry]) -> None:
-    """Write all history entries to file (overwrites existing)."""
+    """Write all history entries to file (overwrites existing).
+
+    Callers must hold the exclusive history lock.
+    """
+    # Oldest first, the order appends keep; this also repairs files written
+    # newest-first by older versions
+    entries = sorted(entries, key=lambda e: e.start_time)
+
     # Limit to max entries to prevent file from growing too large
     if len(entries) > MAX_HISTORY_ENTRIES:
         entries = entries[-MAX_HISTORY_ENTRIES:]
 
-    with open(HISTORY_FILE, "w") as f:
-        for entry in entries:
-            f.write(json.dumps(entry.to_dict()) + "\n")
+    # Write to a temp file and swap it in so readers never see a partial file
+    tmp_file = HISTORY_FILE.with_suffix(".jsonl.tmp")
+    with open(tmp_file, "w") as f:
+        f.write("".join(json.dumps(entry.to_dict()) + "\n" for entry in entries))
+    os.replace(tmp_file, HISTORY_FILE)
 
 
 def clear_history() -> int:
@@ -269,5 +487,6 @@ def clear_history() -> int:
     """
     count = len(read_history())
     if HISTORY_FILE.exists():
-        HISTORY_FILE.unlink()
+        with _history_lock(exclusive=True):
+            HISTORY_FILE.unlink(missing_ok=True)
     return count
@@ -1,15 +1,30 @@
 """Job serialization and authentication."""
 
-import base64
-import hashlib
+import functools
 import hmac
-import json
+import itertools
 import os
+import struct
 import time
-import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
+
+from . import fastjson
+
+# Prefer the SIMD-accelerated pybase64 codec when it's installed
+try:
+    import pybase64
+
+    _b64encode = pybase64.b64encode_as_string
+    _b64decode = pybase64.b64decode
+except ImportError:
+    import base64
+
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+    _b64decode = base64.b64decode
 
 
 @dataclass
@@ -42,7 +57,7 @@ class JobResult:
 
 def generate_job_id() -> str:
     """Generate a unique job ID."""
-    return uuid.uuid4().hex[:8]
+    return os.urandom(4).hex()
 
 
 def create_job(
@@ -55,18 +70,19 @@ def create_job(
 ) -> Job:
     """Create a job from a script file."""
     path = Path(script_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Script not found: {script_path}")
-
-    with open(path, "rb") as f:
-        code = f.read()
+    try:
+        code = path.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Script not found: {script_path}") from None
 
     files = {}
     for file_path in extra_files or []:
         fp = Path(file_path)
-        if fp.exists():
-            with open(fp, "rb") as f:
-                files[fp.name] = f.read()
+        try:
+            files[fp.name] = fp.read_bytes()
+        except FileNotFoundError:
+            # Missing extra files are skipped
+            continue
 
     return Job(
         job_id=generate_job_id(),
@@ -80,104 +96,211 @@ def create_job(
     )
 
 
-def compute_auth_hmac(job_id: str, timestamp: float, group_secret: str) -> str:
-    """Compute HMAC for job authentication."""
-    msg = f"{job_id}:{timestamp}".encode()
-    return hmac.new(group_secret.encode(), msg, hashlib.sha256).hexdigest()
+@functools.lru_cache(maxsize=32)
+def _primed_hmac(secret: str) -> hmac.HMAC:
+    """HMAC-SHA256 keyed with secret, for .copy() per message."""
+    return hmac.new(secret.encode(), digestmod="sha256")
+
+
+def _new_mac(group_secret: Union[str, hmac.HMAC]) -> hmac.HMAC:
+    """Fresh HMAC from the secret string or a pre-keyed template."""
+    if isinstance(group_secret, str):
+        group_secret = _primed_hmac(group_secret)
+    return group_secret.copy()
+
+
+def compute_auth_hmac(
+    job_id: str, timestamp: float, group_secret: Union[str, hmac.HMAC]
+) -> str:
+    """Compute HMAC for request authentication (kill/list).
+
+    group_secret can be the secret string or a pre-keyed HMAC template
+    (HomieConfig.hmac_template). Either way key setup is done once and
+    copied per call.
+    """
+    mac = _new_mac(group_secret)
+    mac.update(f"{job_id}:{timestamp}".encode())
+    return mac.hexdigest()
 
 
 def verify_auth_hmac(
-    job_id: str, timestamp: float, provided_hmac: str, group_secret: str
+    job_id: str, timestamp: float, provided_hmac: str, group_secret: Union[str, hmac.HMAC]
 ) -> bool:
-    """Verify job authentication HMAC."""
+    """Verify request authentication HMAC."""
     expected = compute_auth_hmac(job_id, timestamp, group_secret)
     return hmac.compare_digest(expected, provided_hmac)
 
 
-def serialize_job(job: Job, group_secret: str) -> str:
-    """Serialize a job to JSON with authentication."""
-    auth_hmac = compute_auth_hmac(job.job_id, job.timestamp, group_secret)
+# Binary job frame:
+#   [32-byte HMAC-SHA256 of everything after it]
+#   [u32 header_len][header JSON]
+#   [u64 code_len][code]
+#   [u32 file_count] then per file: [u16 name_len][name UTF-8][u64 data_len][data]
+# Only the small metadata header is JSON; code and files travel as raw bytes.
+# The MAC is computed over the same bytes the receiver parses, so the code and
+# files are authenticated along with the metadata.
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_MAC_SIZE = 32
+
+# Socket buffers for job transfers; payloads can run to tens of MB. Client
+# and worker both use this, and _U32 for message length prefixes.
+_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def serialize_job_parts(job: Job, group_secret: Union[str, hmac.HMAC]) -> list[bytes]:
+    """Serialize a job to the pieces of a binary frame, without joining them.
 
-    payload = {
-        "job": {
+    Lets callers copy the frame straight into a reusable buffer
+    (see Client.run_job) instead of allocating it as one new bytes object.
+    """
+    header = fastjson.dumps(
+        {
             "job_id": job.job_id,
             "sender": job.sender,
             "filename": job.filename,
-            "code": base64.b64encode(job.code).decode(),
             "image": job.image,
             "args": job.args,
-            "files": {k: base64.b64encode(v).decode() for k, v in job.files.items()},
             "require_gpu": job.require_gpu,
             "timestamp": job.timestamp,
-        },
-        "auth": {
-            "hmac": auth_hmac,
-        },
-    }
-    return json.dumps(payload)
-
-
-def deserialize_job(data: str, group_secret: str) -> Job:
-    """Deserialize a job from JSON and verify authentication."""
-    payload = json.loads(data)
-
-    job_data = payload["job"]
-    auth_data = payload["auth"]
-
-    # Verify authentication
-    if not verify_auth_hmac(
-        job_data["job_id"],
-        job_data["timestamp"],
-        auth_data["hmac"],
-        group_secret,
-    ):
+        }
+    )
+
+    parts = [_U32.pack(len(header)), header, _U64.pack(len(job.code)), job.code]
+    parts.append(_U32.pack(len(job.files)))
+    for name, content in job.files.items():
+        name_bytes = name.encode()
+        parts += [_U16.pack(len(name_bytes)), name_bytes, _U64.pack(len(content)), content]
+
+    mac = _new_mac(group_secret)
+    for part in parts:
+        mac.update(part)
+    parts.insert(0, mac.digest())
+    return parts
+
+
+def serialize_job(job: Job, group_secret: Union[str, hmac.HMAC]) -> bytes:
+    """Serialize a job to a binary frame with authentication."""
+    return b"".join(serialize_job_parts(job, group_secret))
+
+
+def deserialize_job(data: bytes, group_secret: Union[str, hmac.HMAC]) -> Job:
+    """Deserialize a job from a binary frame and verify authentication.
+
+    The MAC is checked over the raw frame before anything is parsed, so
+    rejected jobs never have their header decoded or code and files copied out.
+    """
+    view = memoryview(data)
+    if len(view) < _MAC_SIZE:
+        raise ValueError("Malformed job payload: frame too short")
+
+    mac = _new_mac(group_secret)
+    mac.update(view[_MAC_SIZE:])
+    if not hmac.compare_digest(mac.digest(), view[:_MAC_SIZE]):
         raise ValueError("Job authentication failed - invalid HMAC")
 
+    try:
+        offset = _MAC_SIZE
+        (header_len,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        job_data = fastjson.loads(bytes(view[offset:offset + header_len]))
+        offset += header_len
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Malformed job payload: {e}") from None
+
     # Check timestamp freshness (within 5 minutes)
     if abs(time.time() - job_data["timestamp"]) > 300:
         raise ValueError("Job authentication failed - timestamp too old")
 
+    try:
+        (code_len,) = _U64.unpack_from(view, offset)
+        offset += _U64.size
+        code = bytes(view[offset:offset + code_len])
+        offset += code_len
+
+        (file_count,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        files = {}
+        for _ in range(file_count):
+            (name_len,) = _U16.unpack_from(view, offset)
+            offset += _U16.size
+            name = str(view[offset:offset + name_len], "utf-8")
+            offset += name_len
+            (data_len,) = _U64.unpack_from(view, offset)
+            offset += _U64.size
+            files[name] = bytes(view[offset:offset + data_len])
+            offset += data_len
+
+        if offset != len(view):
+            raise ValueError("frame length mismatch")
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Malformed job payload: {e}") from None
+
     return Job(
         job_id=job_data["job_id"],
         sender=job_data["sender"],
         filename=job_data["filename"],
-        code=base64.b64decode(job_data["code"]),
+        code=code,
         image=job_data.get("image", "python:3.11-slim"),
         args=job_data["args"],
-        files={k: base64.b64decode(v) for k, v in job_data["files"].items()},
+        files=files,
         require_gpu=job_data.get("require_gpu", False),
         timestamp=job_data["timestamp"],
     )
 
 
-def serialize_result(result: JobResult) -> str:
-    """Serialize a job result to JSON."""
-    return json.dumps(
+def serialize_result(result: JobResult) -> bytes:
+    """Serialize a job result to JSON bytes.
+
+    Output files are concatenated and base64-encoded as one blob, with
+    their names and end offsets alongside, so the codec runs once over a
+    long buffer instead of once per (often tiny) file.
+    """
+    files = result.output_files
+    return fastjson.dumps(
         {
             "job_id": result.job_id,
             "exit_code": result.exit_code,
             "stdout": result.stdout,
             "stderr": result.stderr,
-            "output_files": {
-                k: base64.b64encode(v).decode() for k, v in result.output_files.items()
-            },
+            "output_names": list(files),
+            "output_offsets": list(itertools.accumulate(map(len, files.values()))),
+            "output_blob": _b64encode(b"".join(files.values())),
             "runtime_seconds": result.runtime_seconds,
             "error": result.error,
         }
     )
 
 
-def deserialize_result(data: str) -> JobResult:
+def _unpack_output_files(payload: dict) -> dict[str, bytes]:
+    """Split the output_blob of a serialized result back into files.
+
+    Results from older workers carry a per-file base64 output_files map
+    instead; decode that too rather than dropping their files.
+    """
+    names = payload.get("output_names")
+    if not names:
+        legacy = payload.get("output_files") or {}
+        return {name: _b64decode(data) for name, data in legacy.items()}
+    blob = _b64decode(payload["output_blob"])
+    files = {}
+    start = 0
+    for name, end in zip(names, payload["output_offsets"]):
+        files[name] = blob[start:end]
+        start = end
+    return files
+
+
+def deserialize_result(data: Union[bytes, str]) -> JobResult:
     """Deserialize a job result from JSON."""
-    payload = json.loads(data)
+    payload = fastjson.loads(data)
     return JobResult(
         job_id=payload["job_id"],
         exit_code=payload["exit_code"],
         stdout=payload["stdout"],
         stderr=payload["stderr"],
-        output_files={
-            k: base64.b64decode(v) for k, v in payload.get("output_files", {}).items()
-        },
+        output_files=_unpack_output_files(payload),
         runtime_seconds=payload.get("runtime_seconds", 0.0),
         error=payload.get("error"),
     )
@@ -1,17 +1,24 @@
 """Beautiful terminal UI using rich."""
 
+import atexit
+import operator
+import os
+import threading
 import time
+from collections import deque
 from typing import Optional
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.layout import Layout
 from rich.live import Live
+from rich.markup import escape
 from rich.panel import Panel
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from rich.text import Text
 
 from .discovery import Discovery, Peer
+from .history import JobHistoryEntry
 from .utils import get_local_ip, get_system_stats
 from .worker import Worker
 
@@ -26,6 +33,10 @@ HOMIE_LOGO = """    __  ______  __  _____________
  / __  / /_/ / /  / // // /___
 /_/ /_/\\____/_/  /_/___/_____/"""
 
+# Styled logo, shared read-only by every caller (copy before appending)
+_LOGO_TEXT = Text(HOMIE_LOGO, style="bold cyan")
+_LOGO_STRIP_TEXT = Text(HOMIE_LOGO.strip(), style="bold cyan")
+
 # Compact logo for headers (single line style)
 HOMIE_LOGO_SMALL = r"""  ___ ___  ___  _____ _____
  | . |   ||   ||     |   __|
@@ -60,6 +71,13 @@ NETWORK_HUM_FRAMES = [
    ╰══●════●══─╯""",
 ]
 
+# Styled hum frames for the dashboard, keyed by (frame index, style)
+_HUM_TEXTS = {
+    (i, style): Text(frame.strip(), style=style)
+    for style in ("green", "yellow")
+    for i, frame in enumerate(NETWORK_HUM_FRAMES)
+}
+
 POWERUP_FRAMES = [
     # Frame 1 - Empty
     r"""
@@ -111,55 +129,76 @@ CONNECT_MESSAGES = [
     "ONLINE",
 ]
 
+# Startup animation pieces, built once at import: the logo fade-in steps,
+# then for each power-up step its styled frame, progress bar (20 cells,
+# 4 per step) and status line. The final status line names the node, so
+# it's built per call.
+_POWERUP_STYLES = ("dim", "dim", "yellow", "yellow", "green bold")
+_LOGO_LINES = HOMIE_LOGO.strip().split("\n")
+_LOGO_FADE_IN = tuple(
+    Text("\n".join(_LOGO_LINES[:i]), style="bold cyan") for i in range(len(_LOGO_LINES) + 1)
+)
+_POWERUP_TEXTS = tuple(
+    Text(frame, style=style) for frame, style in zip(POWERUP_FRAMES, _POWERUP_STYLES)
+)
+_PROGRESS_TEXTS = tuple(
+    Text(f"\n    [{'█' * 4 * n}{'░' * (20 - 4 * n)}]", style=style)
+    for n, style in enumerate(_POWERUP_STYLES, 1)
+)
+_CONNECT_TEXTS = tuple(Text(f"\n    ◌ {message}", style="dim") for message in CONNECT_MESSAGES[:-1])
+
 
 def play_startup_animation(name: str) -> None:
-    """Play the startup animation sequence."""
-    # Clear and show logo
-    console.clear()
-
-    # Show logo with fade-in effect
-    logo_lines = HOMIE_LOGO.strip().split('\n')
-    for i in range(len(logo_lines) + 1):
-        console.clear()
-        partial_logo = '\n'.join(logo_lines[:i])
-        console.print(f"[bold cyan]{partial_logo}[/]")
-        time.sleep(0.08)
-
-    time.sleep(0.3)
-
-    # Show network animation frames
-    for i, (frame, message) in enumerate(zip(POWERUP_FRAMES, CONNECT_MESSAGES)):
-        console.clear()
-        console.print(f"[bold cyan]{HOMIE_LOGO}[/]")
-
-        # Color the frame based on progress
-        if i < 2:
-            frame_style = "dim"
-        elif i < 4:
-            frame_style = "yellow"
-        else:
-            frame_style = "green bold"
+    """Play the startup animation sequence.
+
+    Frames are drawn in place on the alternate screen through Live, which
+    only rewrites what changed instead of clearing the terminal per frame.
+    """
+    online = Text.assemble(
+        "\n    ", (f"◉ {CONNECT_MESSAGES[-1]}", "bold green"), " as ", (name, "bold")
+    )
+    with Live(console=console, screen=True, auto_refresh=False) as live:
+        # Show logo with fade-in effect
+        for partial_logo in _LOGO_FADE_IN:
+            live.update(partial_logo, refresh=True)
+            time.sleep(0.08)
 
-        console.print(f"[{frame_style}]{frame}[/]")
+        time.sleep(0.3)
 
-        # Progress bar
-        progress = "█" * (i + 1) * 4 + "░" * (20 - (i + 1) * 4)
-        console.print(f"\n    [{frame_style}][{progress}][/]")
+        # Show network animation frames
+        for frame, progress, status in zip(_POWERUP_TEXTS, _PROGRESS_TEXTS, _CONNECT_TEXTS + (online,)):
+            live.update(Group(_LOGO_TEXT, frame, progress, status), refresh=True)
+            time.sleep(0.4)
+
+        time.sleep(0.5)
 
-        # Message
-        if i == len(CONNECT_MESSAGES) - 1:
-            console.print(f"\n    [bold green]◉ {message}[/] as [bold]{name}[/]")
-        else:
-            console.print(f"\n    [dim]◌ {message}[/]")
 
-        time.sleep(0.4)
+# Shared status/role cells for the peer and history tables. Rich only reads
+# Text when rendering, so one instance can back every row of every frame.
+_PEER_IDLE = Text("● idle", style="green")
+_PEER_BUSY = Text("● busy", style="yellow")
+_JOB_RUNNING = Text("● running", style="yellow")
+_JOB_SUCCESS = Text("✓ success", style="green")
+_JOB_FAILED = Text("✗ failed", style="red")
+_DURATION_RUNNING = Text("running", style="yellow")
+_ROLE_MOOCH = Text("→", style="cyan")  # Sent job
+_ROLE_PLUG = Text("←", style="green")  # Ran job
 
-    time.sleep(0.5)
-    console.clear()
+# CPU usage bars indexed by quarters used (0-4)
+_CPU_BARS = tuple("▓" * i + "░" * (4 - i) for i in range(5))
+
+# Everything a peers-table row shows, fetched in one call
+_peer_row_fields = operator.attrgetter(
+    "name", "ip", "cpu_percent_used", "ram_free_gb", "gpu_name", "gpu_memory_free_gb", "status"
+)
 
 
 def create_peers_table(peers: list[Peer]) -> Table:
-    """Create a table showing all peers."""
+    """Create a table showing all peers, in the given (name) order.
+
+    Discovery.get_peers() and the peer cache written from it are already
+    sorted by name, so the table doesn't sort again.
+    """
     table = Table(show_header=True, header_style="bold cyan", box=None)
     table.add_column("NAME", style="green", no_wrap=True)
     table.add_column("IP", style="dim")
@@ -168,27 +207,25 @@ def create_peers_table(peers: list[Peer]) -> Table:
     table.add_column("GPU", style="yellow")
     table.add_column("STATUS", justify="center")
 
-    for peer in sorted(peers, key=lambda p: p.name):
+    for peer in peers:
+        name, ip, cpu, ram_free, gpu_name, gpu_free, peer_status = _peer_row_fields(peer)
+
         # CPU bar visualization
-        cpu_blocks = int(peer.cpu_percent_used / 25)
-        cpu_bar = "▓" * cpu_blocks + "░" * (4 - cpu_blocks)
+        cpu_bar = _CPU_BARS[min(4, max(0, int(cpu) // 25))]
 
         # Status indicator
-        if peer.status == "idle":
-            status = Text("● idle", style="green")
-        else:
-            status = Text("● busy", style="yellow")
+        status = _PEER_IDLE if peer_status == "idle" else _PEER_BUSY
 
         # GPU display
-        gpu = peer.gpu_name if peer.gpu_name else "-"
-        if peer.gpu_memory_free_gb:
-            gpu = f"{peer.gpu_name} ({peer.gpu_memory_free_gb:.1f}G free)"
+        gpu = gpu_name if gpu_name else "-"
+        if gpu_free:
+            gpu = f"{gpu_name} ({gpu_free:.1f}G free)"
 
         table.add_row(
-            peer.name,
-            peer.ip,
-            f"{peer.cpu_percent_used:3.0f}% {cpu_bar}",
-            f"{peer.ram_free_gb:.1f} GB",
+            name,
+            ip,
+            f"{cpu:3.0f}% {cpu_bar}",
+            f"{ram_free:.1f} GB",
             gpu,
             status,
         )
@@ -198,8 +235,7 @@ def create_peers_table(peers: list[Peer]) -> Table:
 
 def create_header(name: str, ip: str) -> Panel:
     """Create the header panel."""
-    header_text = Text()
-    header_text.append(HOMIE_LOGO.strip(), style="bold cyan")
+    header_text = _LOGO_STRIP_TEXT.copy()
     header_text.append(f"\n{name}@{ip}", style="dim")
     return Panel(
         header_text,
@@ -210,11 +246,10 @@ def create_header(name: str, ip: str) -> Panel:
 
 def create_stats_panel(stats: dict) -> Panel:
     """Create local machine stats panel."""
-    content = Text()
-    content.append(f"CPU: {stats['cpu_count']} cores\n", style="dim")
-    content.append(f"RAM: {stats['ram_total']:.1f} GB\n", style="dim")
+    markup = f"[dim]CPU: {stats['cpu_count']} cores\nRAM: {stats['ram_total']:.1f} GB[/]\n"
     if stats.get("gpu"):
-        content.append(f"GPU: {stats['gpu']}\n", style="yellow")
+        markup += f"[yellow]GPU: {escape(stats['gpu'])}[/]\n"
+    content = Text.from_markup(markup)
     return Panel(content, title="Your Machine", border_style="dim")
 
 
@@ -223,14 +258,21 @@ def create_cluster_summary(peers: list[Peer]) -> str:
     if not peers:
         return "[dim]No homies online[/]"
 
-    total_ram = sum(p.ram_free_gb for p in peers)
-    gpus = [p for p in peers if p.gpu_name]
-    busy = sum(1 for p in peers if p.status == "busy")
+    # Single pass over the peers
+    total_ram = 0.0
+    gpu_count = 0
+    busy = 0
+    for p in peers:
+        total_ram += p.ram_free_gb
+        if p.gpu_name:
+            gpu_count += 1
+        if p.status == "busy":
+            busy += 1
 
     parts = [
         f"[green]{len(peers)}[/] peers",
         f"[cyan]{total_ram:.1f} GB[/] RAM",
-        f"[yellow]{len(gpus)}[/] GPUs",
+        f"[yellow]{gpu_count}[/] GPUs",
     ]
     if busy:
         parts.append(f"[yellow]{busy}[/] busy")
@@ -281,6 +323,12 @@ def create_dashboard_layout(
     return layout
 
 
+# Periodic dashboard frame interval while peers or jobs are visible, and the
+# cap it backs off to when there's nothing to watch. Changes redraw at once.
+DASHBOARD_REFRESH_INTERVAL = 2.0
+DASHBOARD_IDLE_INTERVAL = 5.0
+
+
 class LiveDashboard:
     """Live-updating dashboard for homie up."""
 
@@ -299,45 +347,123 @@ class LiveDashboard:
         self.gpu_ok = gpu_ok
         self.ip = get_local_ip()
         self.stats = get_system_stats()
-        self._events: list[str] = []
+        self._events: deque[Text] = deque(maxlen=5)  # Keep only last 5 events
+        self._events_text: Optional[Text] = None  # Rendered _events; None when stale
+        self._events_version = 0
+        self._events_lock = threading.Lock()  # add_event runs on discovery threads
+        self._running_jobs: tuple = ()  # Worker's running jobs as of _running_jobs_version
+        self._running_jobs_version = -1
         self._frame_count = 0
+        self._peers_sig: Optional[tuple] = None  # What the peers panel currently shows
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._layout = self._build_layout()
 
     def add_event(self, message: str) -> None:
-        """Add an event to the log."""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self._events.append(f"[dim]{timestamp}[/] {message}")
-        # Keep only last 5 events
-        self._events = self._events[-5:]
+        """Add an event to the log.
+
+        message is Rich markup, parsed once here; escape() anything in it
+        that comes from the network.
+        """
+        timestamp = time.strftime("%H:%M:%S")
+        event = Text.from_markup(f"[dim]{timestamp}[/] {message}")
+        with self._events_lock:
+            self._events.append(event)
+            self._events_text = None
+            self._events_version += 1
+        self.wake()
+
+    def wake(self) -> None:
+        """Redraw promptly, e.g. when a job starts, even if the dashboard is idling."""
+        self._wake_event.set()
+
+    def _versions(self) -> tuple[int, int, int]:
+        """Change counters for everything the dashboard shows."""
+        jobs_version = self.worker.jobs_version if self.worker else 0
+        return (self.discovery.version, jobs_version, self._events_version)
 
     def run(self) -> None:
         """Run the live dashboard."""
+        versions = self._versions()
+        # Peer cache for other commands is written off the render loop
+        self._stop_event.clear()
+        cache_writer = threading.Thread(target=self._cache_writer, daemon=True)
+        cache_writer.start()
+        # We refresh the screen ourselves, only when a new frame is built,
+        # drawing into the alternate screen so frames repaint in place
+        # instead of scrolling the terminal
+        interval = DASHBOARD_REFRESH_INTERVAL
+        last_render = time.monotonic()
         with Live(
             self._render(),
             console=console,
-            refresh_per_second=2,
-            screen=False,
+            auto_refresh=False,
+            screen=True,
         ) as live:
             try:
                 while True:
-                    self._frame_count += 1
-                    live.update(self._render())
-                    # Write peer cache for other commands to use
-                    self.discovery.write_peer_cache()
-                    time.sleep(0.5)
+                    # wake() (peer/job/event changes) cuts the wait short
+                    self._wake_event.wait(interval)
+                    self._wake_event.clear()
+
+                    # Redraw on changes, plus a periodic frame to step the
+                    # network hum and running-job timers
+                    current = self._versions()
+                    changed = current != versions
+                    now = time.monotonic()
+                    if changed or now - last_render >= DASHBOARD_REFRESH_INTERVAL:
+                        self._frame_count += 1
+                        versions = current
+                        live.update(self._render(), refresh=True)
+                        last_render = now
+
+                    # Back off the periodic frame while there's nothing to show
+                    if changed or self._running_jobs or self.discovery.get_peers():
+                        interval = DASHBOARD_REFRESH_INTERVAL
+                    else:
+                        interval = min(DASHBOARD_IDLE_INTERVAL, interval * 1.5)
             except KeyboardInterrupt:
                 pass
-
-    def _get_network_hum(self) -> str:
-        """Get current network hum animation frame."""
+            finally:
+                self._stop_event.set()
+                cache_writer.join(1)
+
+    def _cache_writer(self) -> None:
+        """Write the peer cache when peers change, and often enough to stay fresh.
+
+        Readers (homie peers/run) treat a cache older than 10s as stale.
+        """
+        written_version = -1
+        written_at = 0.0
+        while not self._stop_event.wait(2.0):
+            version = self.discovery.version
+            if version != written_version or time.monotonic() - written_at >= 5.0:
+                try:
+                    self.discovery.write_peer_cache()
+                except OSError:
+                    continue
+                written_version = version
+                written_at = time.monotonic()
+
+    def _get_running_jobs(self) -> tuple:
+        """Running jobs on our worker, re-fetched only when the job set changed."""
+        if self.worker is None:
+            return ()
+        # Read the version first so a change during the fetch triggers a refetch
+        version = self.worker.jobs_version
+        if version != self._running_jobs_version:
+            self._running_jobs = tuple(self.worker.get_running_jobs())
+            self._running_jobs_version = version
+        return self._running_jobs
+
+    def _get_network_hum(self, style: str) -> Text:
+        """Get current network hum animation frame (shared; copy before appending)."""
+        # One step per rendered frame
         frame_idx = self._frame_count % len(NETWORK_HUM_FRAMES)
-        return NETWORK_HUM_FRAMES[frame_idx]
-
-    def _render(self) -> Layout:
-        """Render the dashboard."""
-        peers = self.discovery.get_peers()
-        running_jobs = self.worker.get_running_jobs() if self.worker else []
+        return _HUM_TEXTS[frame_idx, style]
 
+    def _build_layout(self) -> Layout:
+        """Build the dashboard skeleton, filling in the panels that never change."""
         layout = Layout()
         layout.split_column(
             Layout(name="header", size=9),
@@ -347,111 +473,114 @@ class LiveDashboard:
         )
 
         # === HEADER: Logo + Network Hum ===
-        header_layout = Layout()
-        header_layout.split_row(
+        layout["header"].split_row(
             Layout(name="logo", ratio=2),
             Layout(name="network", ratio=1),
         )
 
         # Logo
-        logo_text = Text()
-        logo_text.append(HOMIE_LOGO, style="bold cyan")
-        header_layout["logo"].update(Panel(logo_text, border_style="cyan"))
-
-        # Network hum
-        network_frame = self._get_network_hum()
-        if peers:
-            net_style = "green"
-        else:
-            net_style = "yellow"
-
-        network_text = Text()
-        network_text.append(network_frame.strip(), style=net_style)
-        network_text.append("\n")
-        if peers:
-            network_text.append("● MESH ACTIVE", style="bold green")
-            network_text.append(f" ({len(peers)} nodes)", style="dim")
-        else:
-            network_text.append("◌ SCANNING...", style="yellow")
-        header_layout["network"].update(Panel(network_text, border_style=net_style))
-
-        layout["header"].update(header_layout)
+        layout["logo"].update(Panel(_LOGO_TEXT, border_style="cyan"))
 
         # === INFO: Your details ===
         config = self.discovery.config
-        info_layout = Layout()
-        info_layout.split_row(
+        layout["info"].split_row(
             Layout(name="identity"),
             Layout(name="resources"),
             Layout(name="status"),
         )
 
         # Identity
-        identity_text = Text()
-        identity_text.append("Name: ", style="dim")
-        identity_text.append(f"{self.name}\n", style="bold green")
-        identity_text.append("IP: ", style="dim")
-        identity_text.append(f"{self.ip}\n")
-        identity_text.append("Port: ", style="dim")
-        identity_text.append(f"{config.worker_port}")
-        info_layout["identity"].update(Panel(identity_text, title="[dim]YOU[/]", border_style="dim"))
+        identity_text = Text.from_markup(
+            f"[dim]Name: [/][bold green]{escape(self.name)}[/]\n"
+            f"[dim]IP: [/]{self.ip}\n"
+            f"[dim]Port: [/]{config.worker_port}"
+        )
+        layout["identity"].update(Panel(identity_text, title="[dim]YOU[/]", border_style="dim"))
 
         # Resources - show what you're sharing with the network
-        resources_text = Text()
-        resources_text.append("CPU: ", style="dim")
-        resources_text.append(f"{config.container_cpu_limit} cores\n", style="cyan")
-        resources_text.append("RAM: ", style="dim")
-        resources_text.append(f"{config.container_memory_limit}\n", style="cyan")
-        resources_text.append("Timeout: ", style="dim")
-        resources_text.append(f"{config.container_timeout}s", style="cyan")
-        info_layout["resources"].update(Panel(resources_text, title="[dim]SHARING[/]", border_style="dim"))
+        resources_text = Text.from_markup(
+            f"[dim]CPU: [/][cyan]{config.container_cpu_limit} cores[/]\n"
+            f"[dim]RAM: [/][cyan]{escape(config.container_memory_limit)}[/]\n"
+            f"[dim]Timeout: [/][cyan]{config.container_timeout}s[/]"
+        )
+        layout["resources"].update(Panel(resources_text, title="[dim]SHARING[/]", border_style="dim"))
 
-        # Status indicators
-        status_text = Text()
-        if self.docker_ok:
-            status_text.append("● Docker\n", style="green")
-        else:
-            status_text.append("○ Docker\n", style="red")
-        status_text.append("● Discovery\n", style="green")
-        if self.gpu_ok:
-            status_text.append("● GPU\n", style="green")
-        else:
-            status_text.append("○ GPU\n", style="dim")
-        info_layout["status"].update(Panel(status_text, title="[dim]STATUS[/]", border_style="dim"))
+        # === FOOTER: Activity + Running Jobs ===
+        layout["footer"].split_row(
+            Layout(name="events", ratio=2),
+            Layout(name="jobs", ratio=1),
+        )
 
-        layout["info"].update(info_layout)
+        return layout
 
-        # === PEERS: Homies online ===
+    def _render(self) -> Layout:
+        """Render the dashboard, updating only the panels whose content can change."""
+        peers = self.discovery.get_peers()
+        running_jobs = self._get_running_jobs()
+        layout = self._layout
+
+        # Network hum
         if peers:
-            peers_panel = Panel(
-                create_peers_table(peers),
-                title="[bold]HOMIES ONLINE[/]",
-                subtitle=create_cluster_summary(peers),
-                border_style="green",
-            )
+            net_style = "green"
         else:
-            peers_panel = Panel(
-                Text("Searching for homies...\n\n[dim]Make sure they're running 'homie up' with the same group secret[/]", justify="center"),
-                title="[bold]HOMIES ONLINE[/]",
-                border_style="dim",
-            )
-        layout["peers"].update(peers_panel)
+            net_style = "yellow"
 
-        # === FOOTER: Activity + Running Jobs ===
-        footer_layout = Layout()
-        footer_layout.split_row(
-            Layout(name="events", ratio=2),
-            Layout(name="jobs", ratio=1),
+        network_text = self._get_network_hum(net_style).copy()
+        network_text.append("\n")
+        if peers:
+            network_text.append("● MESH ACTIVE", style="bold green")
+            network_text.append(f" ({len(peers)} nodes)", style="dim")
+        else:
+            network_text.append("◌ SCANNING...", style="yellow")
+        layout["network"].update(Panel(network_text, border_style=net_style))
+
+        # Status indicators
+        status_text = Text.from_markup(
+            ("[green]● Docker[/]\n" if self.docker_ok else "[red]○ Docker[/]\n")
+            + "[green]● Discovery[/]\n"
+            + ("[green]● GPU[/]\n" if self.gpu_ok else "[dim]○ GPU[/]\n")
         )
+        layout["status"].update(Panel(status_text, title="[dim]STATUS[/]", border_style="dim"))
 
-        # Events
-        if self._events:
-            events_text = Text("\n".join(self._events))
-        else:
-            events_text = Text("Waiting for activity...", style="dim")
-        footer_layout["events"].update(
-            Panel(events_text, title="[bold]ACTIVITY[/]", border_style="dim")
+        # === PEERS: Homies online ===
+        # Rebuilt only when something the table shows (at its precision) changed
+        peers_sig = tuple(
+            (p.name, p.ip, round(p.cpu_percent_used), round(p.ram_free_gb, 1),
+             p.gpu_name, round(p.gpu_memory_free_gb or 0, 1), p.status)
+            for p in peers
         )
+        if peers_sig != self._peers_sig:
+            self._peers_sig = peers_sig
+            if peers:
+                peers_panel = Panel(
+                    create_peers_table(peers),
+                    title="[bold]HOMIES ONLINE[/]",
+                    subtitle=create_cluster_summary(peers),
+                    border_style="green",
+                )
+            else:
+                peers_panel = Panel(
+                    Text("Searching for homies...\n\n[dim]Make sure they're running 'homie up' with the same group secret[/]", justify="center"),
+                    title="[bold]HOMIES ONLINE[/]",
+                    border_style="dim",
+                )
+            layout["peers"].update(peers_panel)
+
+        # Events (re-rendered only after add_event). The check and rebuild
+        # share add_event's lock so an event added mid-join isn't hidden
+        # behind a cache that predates it.
+        with self._events_lock:
+            events_text = None
+            if self._events_text is None:
+                if self._events:
+                    self._events_text = Text("\n").join(self._events)
+                else:
+                    self._events_text = Text("Waiting for activity...", style="dim")
+                events_text = self._events_text
+        if events_text is not None:
+            layout["events"].update(
+                Panel(events_text, title="[bold]ACTIVITY[/]", border_style="dim")
+            )
 
         # Running jobs
         if running_jobs:
@@ -462,12 +591,10 @@ class LiveDashboard:
                 jobs_text.append(f"  {rj.job.sender} ({int(elapsed)}s)\n", style="dim")
         else:
             jobs_text = Text("No jobs running", style="dim")
-        footer_layout["jobs"].update(
+        layout["jobs"].update(
             Panel(jobs_text, title="[bold]RUNNING[/]", border_style="dim")
         )
 
-        layout["footer"].update(footer_layout)
-
         return layout
 
 
@@ -483,24 +610,20 @@ def print_startup_banner(
     stats = get_system_stats()
 
     # Logo
-    console.print(f"[bold cyan]{HOMIE_LOGO}[/]")
+    console.print(_LOGO_TEXT)
 
     # Info panel
-    content = Text()
-    content.append(f"Name: ", style="dim")
-    content.append(f"{name}\n", style="green bold")
-    content.append(f"IP: ", style="dim")
-    content.append(f"{ip}\n")
-    content.append(f"Port: ", style="dim")
-    content.append(f"{port}\n")
-    content.append("─" * 30 + "\n", style="dim")
-    content.append(f"CPU: ", style="dim")
-    content.append(f"{stats.cpu_count} cores\n")
-    content.append(f"RAM: ", style="dim")
-    content.append(f"{stats.ram_total_gb:.1f} GB\n")
+    markup = (
+        f"[dim]Name: [/][green bold]{escape(name)}[/]\n"
+        f"[dim]IP: [/]{ip}\n"
+        f"[dim]Port: [/]{port}\n"
+        f"[dim]{'─' * 30}[/]\n"
+        f"[dim]CPU: [/]{stats.cpu_count} cores\n"
+        f"[dim]RAM: [/]{stats.ram_total_gb:.1f} GB\n"
+    )
     if stats.gpu_name:
-        content.append(f"GPU: ", style="dim")
-        content.append(f"{stats.gpu_name}\n", style="yellow")
+        markup += f"[dim]GPU: [/][yellow]{escape(stats.gpu_name)}[/]\n"
+    content = Text.from_markup(markup)
 
     console.print(Panel(content, border_style="cyan"))
     console.print()
@@ -553,13 +676,81 @@ def print_job_start(peer_name: str, job_id: str, script: str, args: list[str]) -
     console.print()
 
 
+# Job output lines are batched and printed together every 50 ms, or as soon
+# as 8 KB is pending, instead of one console write per line.
+# HOMIE_STDOUT_BUFFER=0 prints every line immediately.
+OUTPUT_BUFFERED = os.environ.get("HOMIE_STDOUT_BUFFER", "1") != "0"
+OUTPUT_FLUSH_INTERVAL = 0.05
+OUTPUT_FLUSH_BYTES = 8192
+
+
+class _OutputBuffer:
+    """Pending job output lines plus the thread that flushes them."""
+
+    def __init__(self):
+        self._lines: list[Text] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def write(self, line: Text) -> None:
+        with self._lock:
+            self._lines.append(line)
+            self._size += len(line)
+            full = self._size >= OUTPUT_FLUSH_BYTES
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        # Print under the lock so concurrent flushes can't reorder lines
+        with self._lock:
+            if not self._lines:
+                return
+            lines, self._lines, self._size = self._lines, [], 0
+            console.print(*lines, sep="\n")
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(OUTPUT_FLUSH_INTERVAL)
+            self.flush()
+
+
+_job_output = _OutputBuffer()
+atexit.register(_job_output.flush)
+
+
+# Styled "[peer] " prefixes, built once per peer
+_prefix_cache: dict[str, Text] = {}
+
+
 def print_job_output(peer_name: str, line: str) -> None:
-    """Print a line of job output."""
-    console.print(f"[dim][{peer_name}][/] {line}")
+    """Print a line of job output (batched, see flush_job_output).
+
+    Runs once per output line, so it builds a Text from the cached prefix
+    rather than having Rich parse markup (or the job's own brackets) per line.
+    """
+    prefix = _prefix_cache.get(peer_name)
+    if prefix is None:
+        prefix = _prefix_cache[peer_name] = Text.assemble((f"[{peer_name}]", "dim"), " ")
+    text = prefix.copy()
+    text.append(line)
+    if OUTPUT_BUFFERED:
+        _job_output.write(text)
+    else:
+        console.print(text)
+
+
+def flush_job_output() -> None:
+    """Print any buffered job output now, before printing anything else."""
+    _job_output.flush()
 
 
 def print_job_complete(runtime: float, output_files: list[str]) -> None:
     """Print job completion message."""
+    flush_job_output()
     content = Text()
     content.append(f"Runtime: ", style="dim")
     content.append(f"{runtime:.1f}s\n")
@@ -573,20 +764,18 @@ def print_job_complete(runtime: float, output_files: list[str]) -> None:
 
 def print_job_error(error: str) -> None:
     """Print job error message."""
+    flush_job_output()
     console.print()
     console.print(Panel(Text(error, style="red"), title="[bold red]✗ Job Failed[/]", border_style="red"))
 
 
-def create_history_table(entries: list, show_role: bool = True) -> Table:
+def create_history_table(entries: list[JobHistoryEntry], show_role: bool = True) -> Table:
     """Create a table showing job history.
 
     Args:
         entries: List of JobHistoryEntry objects
         show_role: Whether to show the role column (mooch/plug)
     """
-    from datetime import datetime
-    from .history import JobHistoryEntry
-
     table = Table(show_header=True, header_style="bold cyan", box=None)
     table.add_column("TIME", style="dim", no_wrap=True)
     table.add_column("JOB ID", style="cyan", no_wrap=True)
@@ -597,10 +786,15 @@ def create_history_table(entries: list, show_role: bool = True) -> Table:
     table.add_column("DURATION", justify="right")
     table.add_column("STATUS", justify="center")
 
+    # Rows are shown to the minute, so jobs started in the same minute share a string
+    time_strs: dict[int, str] = {}
+
     for entry in entries:
         # Format timestamp
-        dt = datetime.fromtimestamp(entry.start_time)
-        time_str = dt.strftime("%m/%d %H:%M")
+        minute = int(entry.start_time // 60) * 60
+        time_str = time_strs.get(minute)
+        if time_str is None:
+            time_str = time_strs[minute] = time.strftime("%m/%d %H:%M", time.localtime(minute))
 
         # Format duration
         if entry.runtime_seconds is not None:
@@ -611,21 +805,18 @@ def create_history_table(entries: list, show_role: bool = True) -> Table:
                 secs = int(entry.runtime_seconds % 60)
                 duration = f"{mins}m{secs:02d}s"
         else:
-            duration = Text("running", style="yellow")
+            duration = _DURATION_RUNNING
 
         # Format status
         if entry.success is None:
-            status = Text("● running", style="yellow")
+            status = _JOB_RUNNING
         elif entry.success:
-            status = Text("✓ success", style="green")
+            status = _JOB_SUCCESS
         else:
-            status = Text("✗ failed", style="red")
+            status = _JOB_FAILED
 
         # Role indicator
-        if entry.role == "mooch":
-            role = Text("→", style="cyan")  # Sent job
-        else:
-            role = Text("←", style="green")  # Ran job
+        role = _ROLE_MOOCH if entry.role == "mooch" else _ROLE_PLUG
 
         # Script name with args indicator
         script = entry.filename
@@ -645,9 +836,6 @@ def create_history_table(entries: list, show_role: bool = True) -> Table:
 
 def print_history_summary(stats: dict) -> None:
     """Print history summary statistics."""
-    from rich.columns import Columns
-    from rich.panel import Panel
-
     panels = []
 
     # Total jobs
@@ -699,5 +887,11 @@ def print_history_summary(stats: dict) -> None:
     )
     panels.append(failed_panel)
 
-    console.print(Columns(panels, equal=True))
+    # Equal fixed-width cells: the widest title ("Success Rate") sets the width
+    grid = Table.grid(padding=(0, 1))
+    for _ in panels:
+        grid.add_column(width=18)
+    grid.add_row(*panels)
+
+    console.print(grid)
     console.print()
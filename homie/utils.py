@@ -2,11 +2,40 @@
 
 import socket
 import subprocess
+import sys
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional
 
 import psutil
 
+# NVML bindings (nvidia-ml-py) read GPU state directly; nvidia-smi is the fallback
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+# How long get_local_ip() reuses its last answer
+LOCAL_IP_TTL = 30.0
+
+_local_ip: Optional[str] = None
+_local_ip_time = 0.0
+
+# How long get_system_stats() reuses its last sample
+STATS_TTL = 2.0
+
+_stats_lock = threading.Lock()
+_stats_cache: Optional["SystemStats"] = None
+_stats_time = 0.0
+
+# How often the background thread re-reads GPU state
+GPU_REFRESH_INTERVAL = 2.0
+
+_gpu_lock = threading.Lock()
+_gpu_info: Optional[tuple[Optional[str], Optional[float], Optional[float]]] = None
+_nvml_ok: Optional[bool] = None  # Whether nvmlInit() succeeded; None until tried
+
 
 @dataclass
 class SystemStats:
@@ -23,16 +52,27 @@ class SystemStats:
 
 
 def get_local_ip() -> str:
-    """Get the local IP address for LAN communication."""
+    """Get the local IP address for LAN communication.
+
+    Cached for LOCAL_IP_TTL seconds: the heartbeat asks every couple of
+    seconds, but a long-running node should still notice a network change.
+    """
+    global _local_ip, _local_ip_time
+
+    now = time.monotonic()
+    if _local_ip is not None and now - _local_ip_time < LOCAL_IP_TTL:
+        return _local_ip
+
     try:
         # Connect to a public DNS to determine local IP (doesn't actually send data)
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
     except Exception:
-        return "127.0.0.1"
+        ip = "127.0.0.1"
+
+    _local_ip, _local_ip_time = ip, now
+    return ip
 
 
 def get_hostname() -> str:
@@ -40,31 +80,74 @@ def get_hostname() -> str:
     return socket.gethostname()
 
 
+# The core count doesn't change while we're running
+_CPU_COUNT = psutil.cpu_count(logical=True) or 1
+
+
 def get_cpu_count() -> int:
     """Get number of CPU cores."""
-    return psutil.cpu_count(logical=True) or 1
+    return _CPU_COUNT
 
 
 def get_cpu_percent() -> float:
-    """Get CPU usage percentage (0-100)."""
-    return psutil.cpu_percent(interval=0.1)
+    """Get CPU usage percentage (0-100) since the previous call.
+
+    Non-blocking: psutil compares against the times it saved on the last
+    call (primed at import below) instead of sleeping to take a sample.
+    """
+    return psutil.cpu_percent(interval=None)
+
+
+# Prime the CPU sampler so the first real reading isn't a meaningless 0.0
+psutil.cpu_percent(interval=None)
+
+
+def _read_memory() -> tuple[int, int]:
+    """Get (total, available) RAM in bytes.
+
+    On Linux this parses the two lines we need straight out of /proc/meminfo,
+    which is much cheaper than psutil.virtual_memory() building its full
+    breakdown. Other platforms (and kernels without MemAvailable) use psutil.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/meminfo", "rb") as f:
+                data = f.read()
+            total = int(data.split(b"MemTotal:", 1)[1].split(b"kB", 1)[0])
+            available = int(data.split(b"MemAvailable:", 1)[1].split(b"kB", 1)[0])
+            return total * 1024, available * 1024
+        except (OSError, IndexError, ValueError):
+            pass
+
+    memory = psutil.virtual_memory()
+    return memory.total, memory.available
 
 
 def get_ram_total_gb() -> float:
     """Get total RAM in GB."""
-    return psutil.virtual_memory().total / (1024**3)
+    return _read_memory()[0] / (1024**3)
 
 
 def get_ram_free_gb() -> float:
     """Get available RAM in GB."""
-    return psutil.virtual_memory().available / (1024**3)
+    return _read_memory()[1] / (1024**3)
 
 
-def get_gpu_info() -> tuple[Optional[str], Optional[float], Optional[float]]:
-    """
-    Get GPU information using nvidia-smi.
-    Returns: (gpu_name, total_memory_gb, free_memory_gb) or (None, None, None)
-    """
+def _query_gpu_nvml() -> tuple[Optional[str], Optional[float], Optional[float]]:
+    """Read GPU 0's name and memory through NVML."""
+    try:
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        name = pynvml.nvmlDeviceGetName(handle)
+        if isinstance(name, bytes):  # Older bindings return bytes
+            name = name.decode()
+        memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        return name, memory.total / (1024**3), memory.free / (1024**3)
+    except pynvml.NVMLError:
+        return None, None, None
+
+
+def _query_gpu_smi() -> tuple[Optional[str], Optional[float], Optional[float]]:
+    """Read GPU 0's name and memory by running nvidia-smi."""
     try:
         result = subprocess.run(
             [
@@ -89,17 +172,72 @@ def get_gpu_info() -> tuple[Optional[str], Optional[float], Optional[float]]:
     return None, None, None
 
 
+def _query_gpu() -> tuple[Optional[str], Optional[float], Optional[float]]:
+    """Read GPU state via NVML when available, else nvidia-smi."""
+    global _nvml_ok
+    if _nvml_ok is None:
+        _nvml_ok = False
+        if pynvml is not None:
+            try:
+                pynvml.nvmlInit()
+                _nvml_ok = True
+            except pynvml.NVMLError:
+                pass
+    return _query_gpu_nvml() if _nvml_ok else _query_gpu_smi()
+
+
+def _gpu_refresh_loop() -> None:
+    """Keep _gpu_info current so get_gpu_info() never waits on the driver."""
+    global _gpu_info
+    while True:
+        time.sleep(GPU_REFRESH_INTERVAL)
+        _gpu_info = _query_gpu()
+
+
+def get_gpu_info() -> tuple[Optional[str], Optional[float], Optional[float]]:
+    """
+    Get GPU information (NVML, or nvidia-smi without nvidia-ml-py).
+    Returns: (gpu_name, total_memory_gb, free_memory_gb) or (None, None, None)
+
+    The first call queries synchronously. If a GPU was found, a background
+    thread then refreshes the reading every GPU_REFRESH_INTERVAL seconds and
+    later calls return the latest snapshot. Machines without a GPU are
+    only probed once.
+    """
+    global _gpu_info
+    with _gpu_lock:
+        if _gpu_info is None:
+            _gpu_info = _query_gpu()
+            if _gpu_info[0] is not None:
+                threading.Thread(target=_gpu_refresh_loop, daemon=True).start()
+        return _gpu_info
+
+
 def get_system_stats() -> SystemStats:
-    """Get comprehensive system statistics."""
-    gpu_name, gpu_total, gpu_free = get_gpu_info()
-
-    return SystemStats(
-        hostname=get_hostname(),
-        cpu_count=get_cpu_count(),
-        cpu_percent_used=get_cpu_percent(),
-        ram_total_gb=get_ram_total_gb(),
-        ram_free_gb=get_ram_free_gb(),
-        gpu_name=gpu_name,
-        gpu_memory_total_gb=gpu_total,
-        gpu_memory_free_gb=gpu_free,
-    )
+    """Get comprehensive system statistics.
+
+    Samples are cached for STATS_TTL seconds, so callers polling close together
+    share one nvidia-smi run and psutil read. Treat the result as read-only.
+    """
+    global _stats_cache, _stats_time
+
+    with _stats_lock:
+        now = time.monotonic()
+        if _stats_cache is not None and now - _stats_time < STATS_TTL:
+            return _stats_cache
+
+        gpu_name, gpu_total, gpu_free = get_gpu_info()
+        ram_total, ram_available = _read_memory()
+
+        _stats_cache = SystemStats(
+            hostname=get_hostname(),
+            cpu_count=get_cpu_count(),
+            cpu_percent_used=get_cpu_percent(),
+            ram_total_gb=ram_total / (1024**3),
+            ram_free_gb=ram_available / (1024**3),
+            gpu_name=gpu_name,
+            gpu_memory_total_gb=gpu_total,
+            gpu_memory_free_gb=gpu_free,
+        )
+        _stats_time = now
+        return _stats_cache
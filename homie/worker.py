@@ -1,16 +1,41 @@
 """TCP worker daemon for receiving and executing jobs."""
 
-import json
+import contextlib
+import selectors
 import socket
+import struct
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
+from . import fastjson
 from .config import HomieConfig
 from .container import ContainerConfig, ContainerExecutor, OutputChunk
 from .history import append_job_start, update_job_completion
-from .jobs import Job, JobResult, deserialize_job, serialize_result
+from .jobs import (
+    _SOCKET_BUFFER_SIZE,
+    _U32,
+    Job,
+    JobResult,
+    deserialize_job,
+    serialize_result,
+    verify_auth_hmac,
+)
+
+# Pending-connection queue for the listening socket
+_LISTEN_BACKLOG = 128
+
+# Streamed output is sent once this much is pending, or after this delay
+_OUTPUT_FLUSH_BYTES = 16 * 1024
+_OUTPUT_FLUSH_DELAY = 0.005
+
+# Output frame header: message type byte + u32 payload length
+_FRAME_HEADER = struct.Struct(">cI")
+_FRAME_HEADER_PLACEHOLDER = bytes(_FRAME_HEADER.size)
+
+# Results bigger than this are sent after their header rather than joined to it
+_INLINE_RESULT_BYTES = 1024 * 1024
 
 
 @dataclass
@@ -22,6 +47,75 @@ class RunningJob:
     thread: Optional[threading.Thread] = None
 
 
+class _OutputSender:
+    """Coalesces a job's output chunks into fewer framed writes.
+
+    Consecutive chunks from the same stream are merged into one 'O'/'E'
+    frame, and everything pending goes out in a single sendall once
+    _OUTPUT_FLUSH_BYTES accumulate or _OUTPUT_FLUSH_DELAY after the first
+    pending chunk, so chatty jobs don't cost a frame and syscall per line.
+    """
+
+    def __init__(self, conn: socket.socket):
+        self._conn = conn
+        # Framed output waiting to be sent, reused across flushes
+        self._buf = bytearray()
+        self._frame_start = 0  # Offset of the last frame's header in _buf
+        self._frame_type = b""
+        self._closed = False
+        self._cond = threading.Condition()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def send(self, chunk: OutputChunk) -> None:
+        """Queue an output chunk."""
+        # Message type: 'O' for stdout, 'E' for stderr
+        msg_type = b'O' if chunk.stream == "stdout" else b'E'
+        data = chunk.data.encode("utf-8")
+        with self._cond:
+            buf = self._buf
+            if not buf:
+                self._cond.notify()  # Start the flush delay
+            if not buf or msg_type != self._frame_type:
+                # Open a new frame, leaving room for its header
+                self._frame_start = len(buf)
+                self._frame_type = msg_type
+                buf += _FRAME_HEADER_PLACEHOLDER
+            buf += data
+            # (Re)write the header in place to cover everything appended
+            start = self._frame_start
+            _FRAME_HEADER.pack_into(buf, start, msg_type, len(buf) - start - _FRAME_HEADER.size)
+            if len(buf) >= _OUTPUT_FLUSH_BYTES:
+                self._flush()
+
+    def close(self) -> None:
+        """Send anything still pending and stop the flusher."""
+        with self._cond:
+            self._flush()
+            self._closed = True
+            self._cond.notify()
+        self._flusher.join(1.0)
+
+    def _flush(self) -> None:
+        # Called with the lock held, which also keeps frames in order
+        if not self._buf:
+            return
+        try:
+            self._conn.sendall(self._buf)
+        except Exception:
+            pass  # Connection may be closed
+        del self._buf[:]
+
+    def _flush_loop(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if not self._buf:
+                    self._cond.wait()
+                    continue
+                self._cond.wait(_OUTPUT_FLUSH_DELAY)
+                self._flush()
+
+
 class Worker:
     """TCP server that receives and executes jobs from peers."""
 
@@ -43,14 +137,21 @@ class Worker:
                 memory_limit=config.container_memory_limit,
                 timeout=config.container_timeout,
                 network_mode=config.container_network,
+                workspace_root=config.container_workspace_root,
+                tmp_size=config.container_tmp_size,
             )
         )
 
         self._running_jobs: dict[str, RunningJob] = {}
+        self.jobs_version = 0  # Bumped whenever a job starts or finishes
         self._lock = threading.Lock()
         self._running = False
         self._server_socket: Optional[socket.socket] = None
         self._server_thread: Optional[threading.Thread] = None
+        self._wakeup_r: Optional[socket.socket] = None
+        self._wakeup_w: Optional[socket.socket] = None
+        # Caps concurrent connection handlers; extra connections are turned away
+        self._connection_slots = threading.BoundedSemaphore(config.worker_max_connections)
 
     def start(self) -> None:
         """Start the worker server."""
@@ -62,9 +163,16 @@ class Worker:
         # Create TCP server socket
         self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Set before listen() so accepted sockets inherit them (and the
+        # TCP window scale is negotiated to match)
+        self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_BUFFER_SIZE)
+        self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_BUFFER_SIZE)
         self._server_socket.bind(("", self.config.worker_port))
-        self._server_socket.listen(5)
-        self._server_socket.settimeout(1.0)
+        self._server_socket.listen(_LISTEN_BACKLOG)
+        self._server_socket.setblocking(False)
+
+        # Lets stop() wake the accept loop immediately
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
 
         # Start server thread
         self._server_thread = threading.Thread(target=self._server_loop, daemon=True)
@@ -73,8 +181,14 @@ class Worker:
     def stop(self) -> None:
         """Stop the worker server."""
         self._running = False
+        if self._wakeup_w:
+            try:
+                self._wakeup_w.send(b"\0")
+            except OSError:
+                pass
         if self._server_socket:
             self._server_socket.close()
+        self._executor.shutdown()
 
     def is_docker_available(self) -> bool:
         """Check if Docker is available for execution."""
@@ -84,41 +198,94 @@ class Worker:
         """Check if GPU support is available."""
         return self._executor.has_gpu_support()
 
+    def warmup(self, images: Iterable[str]) -> None:
+        """Pre-pull job images in the background so first jobs don't wait on a pull."""
+        thread = threading.Thread(
+            target=self._executor.warmup,
+            args=(list(images),),
+            daemon=True,
+        )
+        thread.start()
+
     def get_running_jobs(self) -> list[RunningJob]:
         """Get list of currently running jobs."""
         with self._lock:
             return list(self._running_jobs.values())
 
     def _server_loop(self) -> None:
-        """Accept incoming connections."""
-        while self._running:
-            try:
-                conn, addr = self._server_socket.accept()
-                # Handle each connection in a new thread
-                thread = threading.Thread(
-                    target=self._handle_connection,
-                    args=(conn, addr),
-                    daemon=True,
-                )
-                thread.start()
-            except socket.timeout:
-                continue
-            except Exception:
-                pass
+        """Accept incoming connections.
+
+        Sleeps in select() until a connection arrives or stop() writes to the
+        wakeup socket, rather than waking every second on an accept timeout.
+        """
+        server_socket = self._server_socket
+        wakeup_r = self._wakeup_r
+        try:
+            with selectors.DefaultSelector() as sel:
+                sel.register(server_socket, selectors.EVENT_READ)
+                sel.register(wakeup_r, selectors.EVENT_READ)
+
+                while self._running:
+                    for key, _ in sel.select():
+                        if key.fileobj is wakeup_r:
+                            return
+                        # Accept everything that's queued
+                        while True:
+                            try:
+                                conn, addr = server_socket.accept()
+                            except BlockingIOError:
+                                break
+                            except OSError:
+                                # e.g. client reset before we got to it
+                                if not self._running:
+                                    return
+                                break
+                            self._dispatch_connection(conn, addr)
+        except (OSError, ValueError):
+            # Socket closed under us by stop()
+            pass
+        finally:
+            wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _dispatch_connection(self, conn: socket.socket, addr: tuple) -> None:
+        """Hand an accepted connection to a handler thread, if a slot is free."""
+        if not self._connection_slots.acquire(blocking=False):
+            self._reject_connection(conn)
+            return
+        # Handle each connection in its own (daemon) thread, which
+        # gives the slot back when done
+        thread = threading.Thread(
+            target=self._handle_connection,
+            args=(conn, addr),
+            daemon=True,
+        )
+        try:
+            thread.start()
+        except RuntimeError:
+            # Out of threads: drop this connection but keep serving. The
+            # handler never ran, so the slot and socket are still ours.
+            self._connection_slots.release()
+            conn.close()
 
     def _handle_connection(self, conn: socket.socket, addr: tuple) -> None:
         """Handle a single client connection."""
         try:
             conn.settimeout(30.0)
+            # Replies are small framed writes; don't let Nagle hold them back
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
             # Receive message type (1 byte)
             msg_type = self._recv_exactly(conn, 1)
             if not msg_type:
                 return
 
-            if msg_type == b'J':
-                # Job submission
+            if msg_type == b'B':
+                # Job submission (binary frame)
                 self._handle_job_submission(conn)
+            elif msg_type == b'J':
+                # Base64 JSON job from a sender that predates the binary frame
+                self._send_error(conn, "Legacy job format - the sending peer needs to upgrade homie")
             elif msg_type == b'K':
                 # Kill request
                 self._handle_kill_request(conn)
@@ -126,7 +293,7 @@ class Worker:
                 # List jobs request
                 self._handle_list_request(conn)
             else:
-                self._send_error(conn, f"Unknown message type: {msg_type}")
+                self._send_error(conn, f"Unknown message type: {bytes(msg_type)}")
 
         except Exception as e:
             try:
@@ -135,6 +302,17 @@ class Worker:
                 pass
         finally:
             conn.close()
+            self._connection_slots.release()
+
+    def _reject_connection(self, conn: socket.socket) -> None:
+        """Turn away a connection when every handler slot is taken."""
+        try:
+            conn.settimeout(1.0)
+            self._send_error(conn, "Worker busy - too many connections, try again later")
+        except Exception:
+            pass
+        finally:
+            conn.close()
 
     def _handle_job_submission(self, conn: socket.socket) -> None:
         """Handle a job submission request with streaming output."""
@@ -142,7 +320,7 @@ class Worker:
         length_bytes = self._recv_exactly(conn, 4)
         if not length_bytes:
             return
-        length = int.from_bytes(length_bytes, "big")
+        length = _U32.unpack(length_bytes)[0]
 
         # Sanity check on length
         if length > 100 * 1024 * 1024:  # 100MB max
@@ -155,7 +333,7 @@ class Worker:
 
         # Deserialize and verify job
         try:
-            job = deserialize_job(job_data.decode(), self.config.group_secret)
+            job = deserialize_job(job_data, self.config.hmac_template)
         except ValueError as e:
             self._send_error(conn, str(e))
             return
@@ -163,11 +341,16 @@ class Worker:
         # Execute job with streaming output
         result = self._execute_job_streaming(job, conn)
 
-        # Send final result (message type 'R')
-        conn.sendall(b'R')
-        result_data = serialize_result(result).encode()
-        conn.sendall(len(result_data).to_bytes(4, "big"))
-        conn.sendall(result_data)
+        # Send final result (message type 'R'). Small results are framed in
+        # a single write; big ones skip copying the whole payload just to
+        # put five header bytes in front of it.
+        result_data = serialize_result(result)
+        header = _FRAME_HEADER.pack(b'R', len(result_data))
+        if len(result_data) > _INLINE_RESULT_BYTES:
+            conn.sendall(header)
+            conn.sendall(result_data)
+        else:
+            conn.sendall(header + result_data)
 
     def _handle_kill_request(self, conn: socket.socket) -> None:
         """Handle a kill request."""
@@ -175,30 +358,29 @@ class Worker:
         length_bytes = self._recv_exactly(conn, 4)
         if not length_bytes:
             return
-        length = int.from_bytes(length_bytes, "big")
+        length = _U32.unpack(length_bytes)[0]
 
         payload_data = self._recv_exactly(conn, length)
         if not payload_data:
             return
 
         try:
-            payload = json.loads(payload_data.decode())
+            payload = fastjson.loads(payload_data)
             job_id = payload["job_id"]
             requester = payload["requester"]  # Who's requesting the kill
             auth_hmac = payload["auth"]["hmac"]
             timestamp = payload["auth"]["timestamp"]
 
-            # Verify auth (simple HMAC check)
-            from .jobs import verify_auth_hmac
-            if not verify_auth_hmac(job_id, timestamp, auth_hmac, self.config.group_secret):
-                conn.sendall(b'0')  # Auth failed
-                return
-
-            # Check timestamp freshness
+            # Check timestamp freshness first; it's cheaper than the HMAC
             if abs(time.time() - timestamp) > 300:
                 conn.sendall(b'0')  # Too old
                 return
 
+            # Verify auth (simple HMAC check)
+            if not verify_auth_hmac(job_id, timestamp, auth_hmac, self.config.hmac_template):
+                conn.sendall(b'0')  # Auth failed
+                return
+
             # Check if requester is authorized to kill this job
             # Only the original sender or the plug (local) can kill a job
             with self._lock:
@@ -226,20 +408,19 @@ class Worker:
         length_bytes = self._recv_exactly(conn, 4)
         if not length_bytes:
             return
-        length = int.from_bytes(length_bytes, "big")
+        length = _U32.unpack(length_bytes)[0]
 
         payload_data = self._recv_exactly(conn, length)
         if not payload_data:
             return
 
         try:
-            payload = json.loads(payload_data.decode())
+            payload = fastjson.loads(payload_data)
             auth_hmac = payload["auth"]["hmac"]
             timestamp = payload["auth"]["timestamp"]
 
             # Verify auth
-            from .jobs import verify_auth_hmac
-            if not verify_auth_hmac("list", timestamp, auth_hmac, self.config.group_secret):
+            if not verify_auth_hmac("list", timestamp, auth_hmac, self.config.hmac_template):
                 conn.sendall(b'0')
                 return
 
@@ -255,10 +436,9 @@ class Worker:
                     })
 
             # Send response
-            response = json.dumps({"jobs": jobs_info}).encode()
-            conn.sendall(b'1')  # Success
-            conn.sendall(len(response).to_bytes(4, "big"))
-            conn.sendall(response)
+            response = fastjson.dumps({"jobs": jobs_info})
+            # Success marker, length and body in a single write
+            conn.sendall(b'1' + _U32.pack(len(response)) + response)
 
         except Exception:
             conn.sendall(b'0')
@@ -267,15 +447,21 @@ class Worker:
         """Kill a job running on this worker (local call)."""
         return self._executor.kill_job(job_id)
 
-    def _recv_exactly(self, conn: socket.socket, n: int) -> Optional[bytes]:
-        """Receive exactly n bytes from socket."""
-        data = b""
-        while len(data) < n:
-            chunk = conn.recv(n - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+    def _recv_exactly(self, conn: socket.socket, n: int) -> Optional[bytearray]:
+        """Receive exactly n bytes from socket.
+
+        Fills one preallocated buffer in place, so large job payloads aren't
+        rebuilt by repeated concatenation.
+        """
+        buf = bytearray(n)
+        with memoryview(buf) as view:
+            offset = 0
+            while offset < n:
+                received = conn.recv_into(view[offset:])
+                if not received:
+                    return None
+                offset += received
+        return buf
 
     def _send_error(self, conn: socket.socket, message: str) -> None:
         """Send an error response."""
@@ -286,9 +472,8 @@ class Worker:
             stderr="",
             error=message,
         )
-        result_data = serialize_result(result).encode()
-        conn.sendall(len(result_data).to_bytes(4, "big"))
-        conn.sendall(result_data)
+        result_data = serialize_result(result)
+        conn.sendall(_U32.pack(len(result_data)) + result_data)
 
     def _execute_job_streaming(self, job: Job, conn: socket.socket) -> JobResult:
         """Execute a job in a container with streaming output to connection."""
@@ -296,6 +481,7 @@ class Worker:
         running_job = RunningJob(job=job)
         with self._lock:
             self._running_jobs[job.job_id] = running_job
+            self.jobs_version += 1
 
         # Log job start to history (plug perspective)
         append_job_start(
@@ -307,6 +493,7 @@ class Worker:
             image=job.image,
             require_gpu=job.require_gpu,
             role="plug",
+            start_time=running_job.start_time,
         )
 
         # Notify status change
@@ -315,22 +502,15 @@ class Worker:
         if self.on_job_started:
             self.on_job_started(job)
 
-        def send_output_chunk(chunk: OutputChunk):
-            """Send an output chunk over the connection."""
-            try:
-                # Message type: 'O' for stdout, 'E' for stderr
-                msg_type = b'O' if chunk.stream == "stdout" else b'E'
-                data = chunk.data.encode("utf-8")
-                conn.sendall(msg_type)
-                conn.sendall(len(data).to_bytes(4, "big"))
-                conn.sendall(data)
-            except Exception:
-                pass  # Connection may be closed
-
+        output = _OutputSender(conn)
         result = None
         try:
             # Execute in container with streaming
-            result = self._executor.execute_streaming(job, send_output_chunk)
+            try:
+                result = self._executor.execute_streaming(job, output.send)
+            finally:
+                # All output must reach the client before the result does
+                output.close()
 
             # Log job completion to history
             update_job_completion(
@@ -343,15 +523,18 @@ class Worker:
 
             return result
         finally:
-            # Remove from running jobs
+            # Remove from running jobs and, if that was the last one, report
+            # idle before releasing the lock: a job registering in between
+            # would otherwise have its "busy" overwritten by a stale "idle"
             with self._lock:
                 self._running_jobs.pop(job.job_id, None)
+                self.jobs_version += 1
+                if not self._running_jobs and self.on_status_changed:
+                    with contextlib.suppress(Exception):
+                        self.on_status_changed("idle")
 
-            # Notify completion
+            # Notify completion. A failing UI callback mustn't mask an error
+            # from the job itself.
             if self.on_job_completed and result:
-                self.on_job_completed(result)
-
-            # Update status if no more jobs
-            with self._lock:
-                if not self._running_jobs and self.on_status_changed:
-                    self.on_status_changed("idle")
+                with contextlib.suppress(Exception):
+                    self.on_job_completed(result)
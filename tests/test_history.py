@@ -0,0 +1,114 @@
+"""Tests for job history reading."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from homie import history
+
+
+def _entry(job_id: str, start_time: float, **extra) -> dict:
+    data = {
+        "job_id": job_id,
+        "sender": "alice",
+        "peer": "bob",
+        "filename": "job.py",
+        "args": [],
+        "image": "python:3.11-slim",
+        "require_gpu": False,
+        "role": "mooch",
+        "start_time": start_time,
+        "end_time": start_time + 1,
+        "runtime_seconds": 1.0,
+        "exit_code": 0,
+        "success": True,
+        "error": None,
+        "output_file_count": 0,
+    }
+    data.update(extra)
+    return data
+
+
+class ReadHistoryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.history_file = Path(tmp.name) / "job_history.jsonl"
+        patcher = mock.patch.object(history, "HISTORY_FILE", self.history_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, records: list[dict]) -> None:
+        self.history_file.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    def test_limit_on_appended_file(self):
+        self._write([_entry(f"job{i}", 100.0 + i) for i in range(10)])
+
+        entries = history.read_history(limit=3)
+
+        self.assertEqual([e.job_id for e in entries], ["job9", "job8", "job7"])
+
+    def test_completion_records_fold_onto_starts(self):
+        start = _entry("job0", 100.0, end_time=None, runtime_seconds=None,
+                       exit_code=None, success=None)
+        update = {"job_id": "job0", "_update": True, "end_time": 105.0,
+                  "runtime_seconds": 5.0, "exit_code": 1, "success": False,
+                  "error": "boom", "output_file_count": 0}
+        self._write([start, update])
+
+        for entries in (history.read_history(), history.read_history(limit=5)):
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0].exit_code, 1)
+            self.assertEqual(entries[0].error, "boom")
+
+    def test_legacy_newest_first_file(self):
+        # Older versions rewrote the file newest-first on every completion,
+        # then appended new starts at the end
+        legacy = [_entry(f"job{i}", 100.0 + i) for i in reversed(range(10))]
+        self._write(legacy + [_entry("job10", 110.0, end_time=None)])
+
+        entries = history.read_history(limit=3)
+        self.assertEqual([e.job_id for e in entries], ["job10", "job9", "job8"])
+
+        entries = history.read_history(limit=20, since=106.5)
+        self.assertEqual([e.job_id for e in entries], ["job10", "job9", "job8", "job7"])
+
+    def test_compaction_writes_oldest_first(self):
+        legacy = [history.JobHistoryEntry.from_dict(_entry(f"job{i}", 100.0 + i))
+                  for i in reversed(range(5))]
+
+        history._write_history(legacy)
+
+        entries = history.read_history(limit=2)
+        self.assertEqual([e.job_id for e in entries], ["job4", "job3"])
+        lines = self.history_file.read_text().splitlines()
+        self.assertEqual(json.loads(lines[0])["job_id"], "job0")
+
+    def test_reads_never_rewrite_the_file(self):
+        starts = [_entry(f"job{i}", 100.0 + i, end_time=None) for i in range(1200)]
+        updates = [{"job_id": f"job{i}", "_update": True, "exit_code": 0}
+                   for i in range(1200)]
+        self._write(starts + updates)
+        before = self.history_file.read_bytes()
+
+        history.read_history()
+        history.get_history_stats()
+
+        self.assertEqual(self.history_file.read_bytes(), before)
+
+    def test_completion_compacts_legacy_file(self):
+        legacy = [_entry(f"job{i}", 100.0 + i) for i in reversed(range(5))]
+        self._write(legacy + [_entry("job5", 105.0, end_time=None)])
+
+        history.update_job_completion("job5", exit_code=0, runtime_seconds=2.0)
+
+        lines = [json.loads(l) for l in self.history_file.read_text().splitlines()]
+        self.assertEqual([r["job_id"] for r in lines], [f"job{i}" for i in range(6)])
+        self.assertEqual(lines[-1]["runtime_seconds"], 2.0)
+        self.assertNotIn("_update", lines[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()